@@ -0,0 +1,271 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from neuron_net.src.models.Network import Network
+from neuron_net.src.interfaces.encoders import encode_observation, decode_output
+import numpy as np
+import asyncio
+import inspect
+import itertools
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.propagate = True
+
+# marks the end of a stream between pipeline stages
+_END = object()
+
+
+class StreamingPipeline:
+    """Drives a network from a continuous stream of observations.
+    Every sample flows through three stages connected by bounded queues:
+    source -> [encode, update, decode] -> sink
+    When the sink is slower than the source the queues fill up and the
+    upstream stages block, so no more input spikes are injected than the
+    consumer can keep up with. The spike queues of the neurons are bounded
+    separately with max_pending_spikes: while the network holds more pending
+    spikes than that, extra clock cycles are run without new input to drain it.
+    """
+
+    def __init__(
+        self,
+        network: Network,
+        sink: Callable[[Any], Any],
+        encoder: Optional[Callable[[Any], List[Tuple[int, np.float32]]]] = None,
+        decoder: Optional[Callable[[np.ndarray], Any]] = None,
+        cycles_per_sample=1,
+        input_offset=0,
+        max_pending_samples=8,
+        max_pending_spikes=None,
+        max_drain_cycles=10,
+    ):
+        """Initialize a streaming pipeline around a network
+        Args:
+            network: the network to drive
+            sink: called with every decoded output, may be a coroutine function for run_async
+            encoder: maps an observation to input data (Neuron_ID, Strength)
+            decoder: maps the output of Network.get_output to the value passed to the sink
+            cycles_per_sample: number of clock cycles the network runs for every sample
+            input_offset: time after the period start at which input spikes are sent
+            max_pending_samples: capacity of the queues between stages
+            max_pending_spikes: spikes the network may hold before input is held back
+            max_drain_cycles: maximum number of input-free cycles run to drain the network
+        """
+        if cycles_per_sample < 1:
+            raise ValueError("cycles_per_sample must be at least 1")
+        if max_pending_samples < 1:
+            raise ValueError("max_pending_samples must be at least 1")
+        self.network = network
+        self.sink = sink
+        self.encoder = (
+            encoder
+            if encoder is not None
+            else lambda observation: encode_observation(observation, network.input_list)
+        )
+        self.decoder = decoder if decoder is not None else decode_output
+        self.cycles_per_sample = cycles_per_sample
+        self.input_offset = input_offset
+        self.max_pending_samples = max_pending_samples
+        self.max_pending_spikes = max_pending_spikes
+        self.max_drain_cycles = max_drain_cycles
+
+        # end-to-end latency (seconds) of every sample, in the order they reached the sink
+        self.latencies = []
+        self.drain_cycles = 0
+
+    def step(self, observation) -> Any:
+        """Push a single observation through the network and return the decoded output"""
+        self._drain()
+        network = self.network
+        network.send_input_data(
+            self.encoder(observation), network.period_start_time + self.input_offset
+        )
+        for _ in range(self.cycles_per_sample):
+            network.update(network.period_start_time + network.clock_cycle_period)
+        return self.decoder(network.get_output())
+
+    def _drain(self):
+        """Run clock cycles without input until the network is below max_pending_spikes"""
+        if self.max_pending_spikes is None:
+            return
+        network = self.network
+        for _ in range(self.max_drain_cycles):
+            if network.pending_spikes() <= self.max_pending_spikes:
+                return
+            network.update(network.period_start_time + network.clock_cycle_period)
+            self.drain_cycles += 1
+        logger.warning(
+            f"Network still holds {network.pending_spikes()} pending spikes "
+            f"after {self.max_drain_cycles} drain cycles"
+        )
+
+    def run(self, source: Iterable, max_samples=None) -> List[float]:
+        """Stream observations from an iterable until it is exhausted.
+        The source is read and the sink is called on their own threads,
+        the network is advanced on the calling thread.
+        Args:
+            source: iterable of observations
+            max_samples: stop after this many samples
+        Returns:
+            latencies of the samples processed in this run
+        """
+        inputs = queue.Queue(maxsize=self.max_pending_samples)
+        outputs = queue.Queue(maxsize=self.max_pending_samples)
+        stop = threading.Event()
+        errors = []
+        start = len(self.latencies)
+        finished = False
+
+        def produce():
+            try:
+                # islice stops before taking an observation past max_samples
+                for observation in itertools.islice(source, max_samples):
+                    if not _put(inputs, (time.perf_counter(), observation), stop):
+                        return
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                _put(inputs, _END, stop)
+
+        def consume():
+            try:
+                while True:
+                    try:
+                        item = outputs.get(timeout=0.1)
+                    except queue.Empty:
+                        if stop.is_set():
+                            return
+                        continue
+                    if item is _END:
+                        return
+                    received, result = item
+                    self.sink(result)
+                    self.latencies.append(time.perf_counter() - received)
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+        producer = threading.Thread(target=produce, daemon=True)
+        consumer = threading.Thread(target=consume, daemon=True)
+        producer.start()
+        consumer.start()
+        try:
+            while not stop.is_set():
+                try:
+                    item = inputs.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _END:
+                    finished = True
+                    break
+                received, observation = item
+                if not _put(outputs, (received, self.step(observation)), stop):
+                    break
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            # the consumer exits on the end marker, or on its own once stopped
+            _put(outputs, _END, stop)
+            consumer.join()
+            stop.set()
+            # after an error the producer may be blocked on the source, it is a
+            # daemon thread and gives up at its next put
+            if finished:
+                producer.join()
+        if errors:
+            raise errors[0]
+        return self.latencies[start:]
+
+    async def run_async(self, source, max_samples=None) -> List[float]:
+        """Stream observations from an async (or regular) iterable.
+        The network is advanced in the default executor so the event loop stays responsive.
+        The sink may be a regular function or a coroutine function.
+        Args:
+            source: async iterable or iterable of observations
+            max_samples: stop after this many samples
+        Returns:
+            latencies of the samples processed in this run
+        """
+        loop = asyncio.get_running_loop()
+        inputs = asyncio.Queue(maxsize=self.max_pending_samples)
+        outputs = asyncio.Queue(maxsize=self.max_pending_samples)
+        start = len(self.latencies)
+
+        async def produce():
+            if hasattr(source, "__aiter__"):
+                iterator = source.__aiter__()
+                count = 0
+                # check the count before taking the next observation from the source
+                while max_samples is None or count < max_samples:
+                    try:
+                        observation = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    await inputs.put((time.perf_counter(), observation))
+                    count += 1
+            else:
+                for observation in itertools.islice(source, max_samples):
+                    await inputs.put((time.perf_counter(), observation))
+            await inputs.put(_END)
+
+        async def process():
+            while True:
+                item = await inputs.get()
+                if item is _END:
+                    await outputs.put(_END)
+                    return
+                received, observation = item
+                result = await loop.run_in_executor(None, self.step, observation)
+                await outputs.put((received, result))
+
+        async def consume():
+            while True:
+                item = await outputs.get()
+                if item is _END:
+                    return
+                received, result = item
+                returned = self.sink(result)
+                if inspect.isawaitable(returned):
+                    await returned
+                self.latencies.append(time.perf_counter() - received)
+
+        tasks = [
+            asyncio.ensure_future(produce()),
+            asyncio.ensure_future(process()),
+            asyncio.ensure_future(consume()),
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        for task in tasks:
+            if task in done and task.exception() is not None:
+                raise task.exception()
+        return self.latencies[start:]
+
+    def latency_summary(self) -> Dict[str, float]:
+        """Summary statistics (seconds) of the end-to-end latency of all processed samples"""
+        if not self.latencies:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        latencies = np.asarray(self.latencies)
+        return {
+            "count": len(latencies),
+            "mean": float(latencies.mean()),
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "max": float(latencies.max()),
+        }
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
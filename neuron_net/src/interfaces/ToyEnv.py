@@ -0,0 +1,56 @@
+from typing import Any, Dict, Tuple
+import numpy as np
+
+
+class CueMatchEnv:
+    """Pure-Python stand-in environment with the gymnasium Env step/reset API.
+    Every step one of n_cues inputs is lit up and the agent is rewarded for
+    choosing the action with the same index. Needs no packages besides NumPy
+    so adapters can be tested without gymnasium installed.
+    """
+
+    def __init__(self, n_cues=2, cue_strength=1.0, max_episode_steps=50, seed=None):
+        """Initialize the environment
+        Args:
+            n_cues: size of the observation vector and number of actions
+            cue_strength: value of the lit up entry of the observation
+            max_episode_steps: number of steps before the episode is truncated
+            seed: seed for the cue generator
+        """
+        self.n_cues = n_cues
+        self.cue_strength = cue_strength
+        self.max_episode_steps = max_episode_steps
+        self.observation_shape = (n_cues,)
+        self.n_actions = n_cues
+        self._rng = np.random.default_rng(seed)
+        self._cue = 0
+        self._steps = 0
+
+    def _observe(self) -> np.ndarray:
+        self._cue = int(self._rng.integers(self.n_cues))
+        observation = np.zeros(self.n_cues, dtype=np.float32)
+        observation[self._cue] = self.cue_strength
+        return observation
+
+    def reset(self, seed=None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Start a new episode
+        Returns:
+            (observation, info)
+        """
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        self._steps = 0
+        return self._observe(), {}
+
+    def step(self, action) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        """Reward the action and present the next cue
+        Returns:
+            (observation, reward, terminated, truncated, info)
+        """
+        if not 0 <= int(action) < self.n_actions:
+            raise ValueError(f"Action {action} outside of [0, {self.n_actions})")
+        reward = 1.0 if int(action) == self._cue else 0.0
+        info = {"cue": self._cue}
+        self._steps += 1
+        truncated = self._steps >= self.max_episode_steps
+        return self._observe(), reward, False, truncated, info
@@ -0,0 +1,195 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from neuron_net.src.models.Network import Network
+import numpy as np
+import copy
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.propagate = True
+
+
+class SyncVectorEnv:
+    """Runs N copies of an environment in lockstep with the gymnasium VectorEnv API.
+    Any environment with gymnasium style reset() and step() methods can be used,
+    including gymnasium environments themselves. Sub-environments that finish an
+    episode are reset automatically, their last observation is returned in
+    infos["final_observation"].
+    """
+
+    def __init__(self, env_fns: List[Callable[[], Any]]):
+        """Initialize the vector environment
+        Args:
+            env_fns: list of functions that each create one environment copy
+        """
+        if not env_fns:
+            raise ValueError("SyncVectorEnv needs at least one environment")
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.num_envs = len(self.envs)
+
+    def reset(self, seed=None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Reset all sub-environments
+        Args:
+            seed: base seed, sub-environment i is seeded with seed + i
+        Returns:
+            (observations, infos) with observations stacked along the first axis
+        """
+        observations = []
+        for idx, env in enumerate(self.envs):
+            observation, _ = env.reset(seed=None if seed is None else seed + idx)
+            observations.append(observation)
+        return np.stack(observations), {}
+
+    def step(
+        self, actions
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """Step every sub-environment with its action
+        Args:
+            actions: one action per sub-environment
+        Returns:
+            (observations, rewards, terminations, truncations, infos)
+        """
+        if len(actions) != self.num_envs:
+            raise ValueError(
+                f"Expected {self.num_envs} actions, received {len(actions)}"
+            )
+        observations = []
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+        terminations = np.zeros(self.num_envs, dtype=bool)
+        truncations = np.zeros(self.num_envs, dtype=bool)
+        final_observations = [None] * self.num_envs
+        for idx, (env, action) in enumerate(zip(self.envs, actions)):
+            observation, reward, terminated, truncated, _ = env.step(action)
+            rewards[idx] = reward
+            terminations[idx] = terminated
+            truncations[idx] = truncated
+            if terminated or truncated:
+                final_observations[idx] = observation
+                observation, _ = env.reset()
+            observations.append(observation)
+        infos = {}
+        if terminations.any() or truncations.any():
+            infos["final_observation"] = final_observations
+        return np.stack(observations), rewards, terminations, truncations, infos
+
+
+class NetworkPolicy:
+    """Uses a Network as the policy for a batch of environment copies.
+    Every environment copy gets its own replica of the network because
+    membrane potentials and pending spikes are per-episode state. With
+    share_weights the replicas reuse the synapse dictionaries of the
+    original network, so STDP updates from all copies train one set of weights.
+    Each replica still queues and applies its own weight updates, so a synapse
+    pruned by one replica disappears for all of them, their pending updates and
+    in-flight spikes for it are skipped (see Neuron.process_weight_updates).
+    Monitors (Network.monitors) are not copied, the replicas start without any.
+    """
+
+    def __init__(
+        self,
+        network: Network,
+        num_envs: int,
+        action_decoder: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        cycles_per_step=1,
+        input_offset=0,
+        input_threshold=0.0,
+        share_weights=True,
+    ):
+        """Initialize the policy
+        Args:
+            network: network used as the policy, replica 0 is the network itself
+            num_envs: number of environment copies
+            action_decoder: maps the (num_envs, num_outputs) phase encoded outputs to actions
+            cycles_per_step: number of clock cycles the network runs for every step
+            input_offset: time after the period start at which observation spikes are sent
+            input_threshold: observation values at or below this do not produce a spike
+            share_weights: replicas share the synapses of the original network
+        """
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+        self.network = network
+        self.num_envs = num_envs
+        self.action_decoder = (
+            action_decoder
+            if action_decoder is not None
+            else lambda outputs: np.argmax(outputs, axis=1)
+        )
+        self.cycles_per_step = cycles_per_step
+        self.input_offset = input_offset
+        self.input_threshold = input_threshold
+
+        self.replicas = [network]
+        for _ in range(num_envs - 1):
+            # monitors such as an ActivityWriter publish to a resource of their own
+            replica = copy.deepcopy(network, {id(network.monitors): []})
+            if share_weights:
+                for neuron_id, neuron in replica.neurons.items():
+                    neuron.synapses = network.neurons[neuron_id].synapses
+            self.replicas.append(replica)
+
+    def __call__(self, observations) -> np.ndarray:
+        """Map a batch of observations to a batch of actions
+        Args:
+            observations: array of shape (num_envs, num_inputs)
+        Returns:
+            array of num_envs actions
+        """
+        observations = np.asarray(observations, dtype=np.float64)
+        # read per call, eliminate_dead_neurons may renumber the inputs
+        input_ids = np.asarray(self.network.input_list)
+        if observations.shape != (self.num_envs, len(input_ids)):
+            raise ValueError(
+                f"Expected observations of shape {(self.num_envs, len(input_ids))}, "
+                f"received {observations.shape}"
+            )
+        # find every spiking input of the whole batch at once
+        rows, cols = np.nonzero(observations > self.input_threshold)
+        strengths = observations[rows, cols]
+        bounds = np.searchsorted(rows, np.arange(self.num_envs + 1))
+
+        outputs = []
+        for idx, network in enumerate(self.replicas):
+            lo, hi = bounds[idx], bounds[idx + 1]
+            input_ids = np.asarray(network.input_list)
+            input_data = list(
+                zip(input_ids[cols[lo:hi]].tolist(), strengths[lo:hi].tolist())
+            )
+            network.send_input_data(
+                input_data, network.period_start_time + self.input_offset
+            )
+            for _ in range(self.cycles_per_step):
+                network.update(network.period_start_time + network.clock_cycle_period)
+            outputs.append(network.get_output())
+        return self.action_decoder(np.stack(outputs))
+
+
+def rollout(policy: Callable, env: SyncVectorEnv, num_steps: int, seed=None) -> Dict:
+    """Run a policy on a vector environment and measure throughput
+    Args:
+        policy: maps a batch of observations to a batch of actions
+        env: vector environment
+        num_steps: number of vector steps to run
+        seed: seed passed to env.reset
+    Returns:
+        dictionary with the number of environment steps, wall time, steps/sec,
+        total reward and number of finished episodes
+    """
+    observations, _ = env.reset(seed=seed)
+    total_reward = 0.0
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        actions = policy(observations)
+        observations, rewards, terminations, truncations, _ = env.step(actions)
+        total_reward += float(rewards.sum())
+        episodes += int(np.count_nonzero(terminations | truncations))
+    seconds = time.perf_counter() - start
+    steps = num_steps * env.num_envs
+    return {
+        "steps": steps,
+        "seconds": seconds,
+        "steps_per_sec": steps / seconds if seconds > 0 else float("inf"),
+        "total_reward": total_reward,
+        "episodes": episodes,
+    }
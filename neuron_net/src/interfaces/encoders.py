@@ -0,0 +1,30 @@
+from typing import List, Tuple
+import numpy as np
+
+
+def encode_observation(
+    observation, input_list: List[int], threshold=0.0
+) -> List[Tuple[int, np.float32]]:
+    """Map an observation vector onto the input neurons of a network.
+    Each entry of the observation is sent as the strength of a spike to the
+    input neuron at the same position in input_list. Entries at or below the
+    threshold do not produce a spike.
+    Args:
+        observation: array-like with one value per input neuron
+        input_list: list of input neurons [neuron_ids]
+        threshold: minimum value that produces a spike
+    Returns:
+        List of input data (Neuron_ID, Strength) for Network.send_input_data
+    """
+    values = np.asarray(observation, dtype=np.float64).ravel()
+    if values.shape[0] != len(input_list):
+        raise ValueError(
+            f"Observation has {values.shape[0]} values but network has {len(input_list)} inputs"
+        )
+    active = np.flatnonzero(values > threshold)
+    return [(input_list[idx], float(values[idx])) for idx in active]
+
+
+def decode_output(output: np.ndarray) -> np.ndarray:
+    """Default decoder, returns the phase encoded output vector unchanged"""
+    return output
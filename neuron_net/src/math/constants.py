@@ -5,3 +5,16 @@ neuron_params = {
     "LEARNING_METHOD": STDP,
     "LEARNING_PARAMS": {"TAU_MINUS": TAU_MINUS, "TAU_PLUS": TAU_PLUS},
 }
+
+# weight given to every connection when a network is initialized
+INITIAL_WEIGHT = 0.2
+
+# distance between time_origin and the period start at which rebasing networks
+# shift the neuron times back (see Network._rebase_time)
+REBASE_THRESHOLD = 2**20
+
+# policies for spike queues that reached their capacity
+DROP_OLDEST = "drop_oldest"  # drop the spike with the earliest arrival time
+DROP_WEAKEST = "drop_weakest"  # drop the spike with the lowest strength
+COALESCE = "coalesce"  # sum into a queued spike arriving in the same time bin
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_WEAKEST, COALESCE)
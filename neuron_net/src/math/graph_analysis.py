@@ -0,0 +1,128 @@
+from typing import List, Tuple
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from neuron_net.src.math.spiking_algorithms import calc_spike_time
+import numpy as np
+import neuron_net.src.math.constants as constants
+
+
+def build_adjacency(network, use_synapses=True) -> Tuple[csr_matrix, np.ndarray]:
+    """Build the sparse delay matrix of a network.
+    Entry [i, j] is the time a spike from neuron_ids[i] takes to reach neuron_ids[j],
+    calculated with calc_spike_time from the synapse weight. Zero delays are kept
+    as explicit entries, so every stored entry is an edge.
+    Args:
+        network: the network to analyze
+        use_synapses: use the live synapse weights, otherwise the initial
+            neuron_connections with their initial weight
+    Returns:
+        (delays, neuron_ids)
+    """
+    if use_synapses:
+        weights, ids = network.get_weight_matrix()
+    else:
+        connections = network.neuron_connections
+        ids = np.array(sorted(connections), dtype=np.int64)
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum([len(connections[n]) for n in ids.tolist()], out=indptr[1:])
+        post_ids = np.fromiter(
+            (post for n in ids.tolist() for post in connections[n]),
+            dtype=np.int64,
+            count=indptr[-1],
+        )
+        data = np.full(len(post_ids), constants.INITIAL_WEIGHT)
+        weights = csr_matrix(
+            (data, np.searchsorted(ids, post_ids), indptr), shape=(len(ids), len(ids))
+        )
+    delays = weights.copy()
+    delays.data = calc_spike_time(delays.data, 0)
+    return delays, ids
+
+
+def _positions(ids: np.ndarray, neuron_ids) -> np.ndarray:
+    """Positions of neuron_ids in the sorted ids array"""
+    neuron_ids = np.asarray(neuron_ids, dtype=np.int64)
+    positions = np.searchsorted(ids, neuron_ids)
+    if len(neuron_ids) and (
+        positions.max() >= len(ids) or not np.array_equal(ids[positions], neuron_ids)
+    ):
+        raise ValueError(f"Neurons {neuron_ids} not found in the network")
+    return positions
+
+
+def reachable(adjacency: csr_matrix, sources, reverse=False) -> np.ndarray:
+    """Breadth first search from several sources at once.
+    Every edge is visited at most once, so this runs in O(nodes + edges).
+    Args:
+        adjacency: sparse adjacency (or delay) matrix
+        sources: positions of the start nodes
+        reverse: follow edges backwards, finding the nodes that can reach a source
+    Returns:
+        boolean mask of the reached nodes, sources included
+    """
+    graph = adjacency.T.tocsr() if reverse else adjacency.tocsr()
+    visited = np.zeros(graph.shape[0], dtype=bool)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    visited[frontier] = True
+    while len(frontier):
+        successors = np.unique(graph[frontier].indices)
+        frontier = successors[~visited[successors]]
+        visited[frontier] = True
+    return visited
+
+
+def input_output_latencies(network, use_synapses=True) -> np.ndarray:
+    """Shortest spike travel time from every input to every output neuron.
+    Args:
+        network: the network to analyze
+        use_synapses: use the live synapse weights (see build_adjacency)
+    Returns:
+        array of shape (len(input_list), len(output_list)), np.inf where an
+        output can not be reached from an input
+    """
+    delays, ids = build_adjacency(network, use_synapses)
+    inputs = _positions(ids, network.input_list)
+    outputs = _positions(ids, network.output_list)
+    if len(inputs) == 0:
+        return np.zeros((0, len(outputs)))
+    distances = dijkstra(delays, directed=True, indices=inputs)
+    return distances[:, outputs]
+
+
+def clustering_coefficients(adjacency: csr_matrix) -> np.ndarray:
+    """Local clustering coefficient of every node, ignoring edge direction and weight.
+    Args:
+        adjacency: sparse adjacency (or delay) matrix
+    Returns:
+        fraction of the pairs of neighbours of each node that are connected
+    """
+    edges = adjacency.tocoo()
+    loops = edges.row == edges.col
+    n = adjacency.shape[0]
+    graph = csr_matrix(
+        (np.ones(np.count_nonzero(~loops)), (edges.row[~loops], edges.col[~loops])),
+        shape=(n, n),
+    )
+    graph = (graph + graph.T).tocsr()
+    graph.data[:] = 1.0
+    degree = np.asarray(graph.sum(axis=1)).ravel()
+    triangles = np.asarray((graph @ graph).multiply(graph).sum(axis=1)).ravel() / 2
+    pairs = degree * (degree - 1) / 2
+    coefficients = np.zeros(len(degree))
+    np.divide(triangles, pairs, out=coefficients, where=pairs > 0)
+    return coefficients
+
+
+def find_dead_neurons(network, use_synapses=True) -> List[int]:
+    """Find the neurons that are not on any path from an input to an output neuron.
+    These neurons can never receive input or never influence the output.
+    Args:
+        network: the network to analyze
+        use_synapses: use the live synapse weights (see build_adjacency)
+    Returns:
+        sorted ids of the dead neurons
+    """
+    delays, ids = build_adjacency(network, use_synapses)
+    from_inputs = reachable(delays, _positions(ids, network.input_list))
+    to_outputs = reachable(delays, _positions(ids, network.output_list), reverse=True)
+    return ids[~(from_inputs & to_outputs)].tolist()
@@ -50,3 +50,30 @@ def calc_next_potential(
     dt = time_received - time_of_last_update
     decay = np.exp(-dt / tau)
     return V_t * np.exp(-dt / tau) + spike_strength * alpha
+
+
+def calc_binned_potential_error(
+    total_strength, bin_width, tau, alpha=0.3
+) -> np.float64:
+    """Upper bound on the potential error of time binned integration.
+    Binned integration adds all spikes arriving within bin_width of the first one
+    as a single summed spike at the time of the first arrival. Every spike then
+    starts decaying up to bin_width too early, so with the update rule of
+    calc_next_potential (alpha * strength on arrival plus strength afterwards)
+    the potential differs from exact integration by at most
+    (1 + alpha) * sum(|strength|) * (1 - exp(-bin_width / tau)),
+    which is roughly (1 + alpha) * sum(|strength|) * bin_width / tau for small bins.
+    The bound holds while the neuron does not activate. An activation is reported at
+    the first arrival of the bin, so its time moves by less than bin_width, and it can
+    be gained or lost when the potential is within this bound of the threshold.
+    STDP follows the reported activation: the first arrival of an activating bin is
+    potentiated and the merged arrivals are depressed as refractory spikes. On the
+    exact path an activation at a later arrival of the bin would instead leave the
+    arrivals before it without an update, so the learning of such bins differs.
+    Args:
+        total_strength: sum of the absolute strengths of the spikes in the bin
+        bin_width: width of the integration bin
+        tau: time constant of the neuron
+        alpha: weight of the arriving spike used in calc_next_potential
+    """
+    return (1 + alpha) * total_strength * (1 - np.exp(-bin_width / tau))
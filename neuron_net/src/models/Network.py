@@ -1,9 +1,15 @@
 from typing import Dict, List, Tuple
 from neuron_net.src.models.Neuron import Neuron
 from neuron_net.src.models.Spike import Spike
+from neuron_net.src.models.Synapses import Synapses
+from neuron_net.src.models.WeightSnapshot import WeightSnapshot, freeze_synapses
+from neuron_net.src.math.graph_analysis import find_dead_neurons
+from scipy.sparse import csr_matrix
 import numpy as np
 from sklearn.preprocessing import normalize
 from collections import deque
+import heapq
+import neuron_net.src.math.constants as constants
 import warnings
 import logging
 
@@ -31,6 +37,15 @@ class Network:
         period_start_time=0,
         clock_cycle_period=100,  # ms - The rate that the encoder resets
         name="test-network",
+        spike_queue_capacity=None,
+        update_queue_capacity=None,
+        overflow_policy=constants.DROP_OLDEST,
+        coalesce_bin=1.0,
+        max_total_spikes=None,
+        integration_bin=None,
+        dead_neuron_interval=None,
+        rebase_time=False,
+        rebase_threshold=constants.REBASE_THRESHOLD,
     ):
         """Using a dictionary of neuron connections, initialize the network
         Args:
@@ -40,6 +55,23 @@ class Network:
             period_start_time: the time to start the phase encoding
             clock_cycle_period: the rate at which the encoder resets
             name: name of the network
+            spike_queue_capacity: per-neuron spike queue capacity, None for unbounded
+            update_queue_capacity: per-neuron weight update queue capacity, None for unbounded
+            overflow_policy: policy for spikes arriving at a full queue (see Neuron)
+            coalesce_bin: width of the time bins used by the COALESCE policy
+            max_total_spikes: capacity for the spikes queued in the whole network, None for unbounded.
+                Once reached, spikes are shed by the receiving neuron's overflow policy.
+            integration_bin: per-neuron time binned integration (see Neuron), None for exact
+            dead_neuron_interval: remove neurons that are no longer on an input to output
+                path every this many cycles (see eliminate_dead_neurons), None to never run
+            rebase_time: keep the times stored in the neurons relative to a recent period
+                for long runs (see _rebase_time). The times passed to and returned by the
+                network stay absolute, the neurons report times relative to time_origin.
+                Spike strengths are computed from the absolute times, as without
+                rebase_time.
+            rebase_threshold: with rebase_time, shift the neuron times once the period
+                start is this far from time_origin. Every shift visits all pending
+                spikes, with 0 that cost is paid on every cycle.
         """
         self.neuron_connections = neuron_connections
         self.input_list = input_list
@@ -55,6 +87,11 @@ class Network:
                 neuron_id,
                 is_input=neuron_id in input_list,
                 is_output=neuron_id in output_list,
+                spike_queue_capacity=spike_queue_capacity,
+                update_queue_capacity=update_queue_capacity,
+                overflow_policy=overflow_policy,
+                coalesce_bin=coalesce_bin,
+                integration_bin=integration_bin,
             )
 
             # add synapses to the neuron
@@ -63,16 +100,29 @@ class Network:
                     raise ValueError(
                         f"Trying to connect {neuron_id} with {connection}, which is not found list of neurons"
                     )
-                curr_neuron.add_synapse(connection, weight=0.2)
+                curr_neuron.add_synapse(connection, weight=constants.INITIAL_WEIGHT)
             self.neurons[neuron_id] = curr_neuron
         # ref start time allows the networks phase encoding to start/reset
         self.period_start_time = period_start_time
         self.clock_cycle_period = clock_cycle_period
-        self.encoding_function = (
-            lambda spike_time: (spike_time - period_start_time - 100)
-            / clock_cycle_period
-        )
+        self._encoding_start_time = period_start_time
+        self._encoding_period = clock_cycle_period
+        # absolute time of the local time 0 used inside the neurons
+        self.time_origin = 0
+        self.rebase_time = rebase_time
+        self.rebase_threshold = rebase_threshold
         self.name = name
+        self.max_total_spikes = max_total_spikes
+        # frozen synapses of the last snapshot (neuron_id: (synapses, version, block))
+        self._weight_blocks = {}
+        self.dead_neuron_interval = dead_neuron_interval
+        self._num_cycles = 0
+        # neurons visited by update, None for all neurons
+        self._active_neurons = None
+        # callables run with the network at the end of every update
+        self.monitors = []
+        if self.rebase_time:
+            self._rebase_time()
 
     def __str__(self):
         return (
@@ -90,6 +140,31 @@ class Network:
         """clock, as in the verb, resets the network to the start time"""
         self.period_start_time = ref_start_time
         self.clock_cycle_period = clock_cycle_period
+        if self.rebase_time:
+            self._rebase_time()
+
+    def encoding_function(self, spike_time):
+        """Phase encode a spike time taken from the neurons (relative to time_origin).
+        The offset between time_origin and the encoding start is computed on its own,
+        so with integer times it stays exact however long the network runs.
+        """
+        offset = self.time_origin - self._encoding_start_time - 100
+        return (spike_time + offset) / self._encoding_period
+
+    def _rebase_time(self):
+        """Move the local time 0 of the neurons to the start of the current period
+        once it is rebase_threshold or more away.
+        All pending spikes, spikes of the current window and neuron timestamps are
+        shifted in one pass, so the neurons only ever hold times within
+        rebase_threshold of 0 instead of ever growing absolute times. Spikes are
+        objects, so a shift visits every pending spike in Python.
+        """
+        shift = self.period_start_time - self.time_origin
+        if shift == 0 or abs(shift) < self.rebase_threshold:
+            return
+        for neuron in self.neurons.values():
+            neuron.rebase_time(shift)
+        self.time_origin += shift
 
     def send_input_data(
         self, input_data: List[Tuple[int, np.float32]], curr_time
@@ -99,36 +174,222 @@ class Network:
             input_data: List of input data (Neuron_ID, Strength)
             curr_time: current time
         """
+        pending = self.pending_spikes() if self.max_total_spikes is not None else 0
         for idx, strength in input_data:
             neuron = self.neurons[idx]
             inc_spike = Spike(
                 origin_neuron=None,
                 dest_id=idx,
                 time_sent=None,
-                time_received=curr_time,
+                time_received=curr_time - self.time_origin,
                 strength=strength,
             )
-            neuron.receive_spike(inc_spike)
+            pending += self._deliver(neuron, inc_spike, pending)
+
+    def _deliver(self, neuron: Neuron, spike: Spike, pending: int) -> int:
+        """Queue a spike at a neuron, respecting the network-wide spike capacity
+        Args:
+            neuron: destination neuron
+            spike: spike to deliver
+            pending: number of spikes currently queued in the network
+        Returns:
+            the change in the number of queued spikes
+        """
+        if neuron.frozen:
+            # not an overflow, counted apart from dropped_spikes
+            neuron.frozen_drops += 1
+            return 0
+        queued = len(neuron.spike_queue)
+        if self.max_total_spikes is not None and pending >= self.max_total_spikes:
+            neuron.shed_spike(spike)
+        else:
+            neuron.receive_spike(spike)
+        return len(neuron.spike_queue) - queued
 
     def update(self, curr_time):
         """Update the network by processing all the spikes and weight updates"""
-        for neuron in self.neurons.values():
+        pending = self.pending_spikes() if self.max_total_spikes is not None else 0
+        neurons = (
+            self.neurons.values()
+            if self._active_neurons is None
+            else self._active_neurons
+        )
+        # the neurons work in times relative to time_origin
+        time_cutoff = curr_time - self.time_origin
+        period_start = self.period_start_time - self.time_origin
+        for neuron in neurons:
             neuron.process_weight_updates()
             logging.debug(f"curr_time: {curr_time}")
             logging.debug(f"self.clock_cycle_period: {self.clock_cycle_period}")
+            queued = len(neuron.spike_queue)
             spikes = list(
                 neuron.process_spikes(
-                    curr_time, self.period_start_time, self.clock_cycle_period
+                    time_cutoff,
+                    period_start,
+                    self.clock_cycle_period,
+                    self.time_origin,
                 )
             )
+            pending -= queued - len(neuron.spike_queue)
             for spike in spikes:
                 if spike.dest_id in self.neurons:
-                    self.neurons[spike.dest_id].receive_spike(spike)
+                    pending += self._deliver(
+                        self.neurons[spike.dest_id], spike, pending
+                    )
                 else:
                     raise ValueError(f"Neuron {spike.dest_id} not found")
         # update the period reference time for proper phase encoding
         self.period_start_time += self.clock_cycle_period
         logging.warning(f"Updated period start time: {self.period_start_time}")
+        if self.rebase_time:
+            self._rebase_time()
+        self._num_cycles += 1
+        if (
+            self.dead_neuron_interval is not None
+            and self._num_cycles % self.dead_neuron_interval == 0
+        ):
+            self.eliminate_dead_neurons()
+        for monitor in self.monitors:
+            monitor(self)
+
+    def eliminate_dead_neurons(self, freeze=False, renumber=False) -> Dict[int, int]:
+        """Remove or freeze the neurons that are not on any path from an input to an output.
+        After pruning such neurons can never receive input or never reach an output,
+        so they only add work to every cycle. Input and output neurons are always kept.
+        Removed neurons take their pending spikes with them, and spikes they already
+        sent are dropped. Frozen neurons keep their state and synapses but are skipped
+        by update and drop incoming spikes, a later pass unfreezes them if they are
+        on an input to output path again.
+        Args:
+            freeze: freeze dead neurons instead of removing them
+            renumber: renumber the remaining neurons to the ids 0..n-1, keeping their order.
+                Changes the ids in input_list and output_list. The neurons get new synapse
+                dicts, so a network sharing its synapses with others stops sharing them.
+        Returns:
+            dictionary mapping the old ids of the remaining neurons to their ids
+        """
+        interface = set(self.input_list) | set(self.output_list)
+        dead = set(find_dead_neurons(self)) - interface
+        if freeze:
+            for neuron_id, neuron in self.neurons.items():
+                neuron.frozen = neuron_id in dead
+        elif dead:
+            removed = {id(self.neurons[neuron_id]) for neuron_id in dead}
+            for neuron_id in dead:
+                del self.neurons[neuron_id]
+            self.neuron_connections = {
+                neuron_id: [post_id for post_id in connections if post_id not in dead]
+                for neuron_id, connections in self.neuron_connections.items()
+                if neuron_id not in dead
+            }
+            for neuron in self.neurons.values():
+                for post_id in dead.intersection(neuron.synapses):
+                    del neuron.synapses[post_id]
+                updates = [u for u in neuron.update_queue if u.post_id not in dead]
+                if len(updates) != len(neuron.update_queue):
+                    neuron.update_queue.clear()
+                    neuron.update_queue.extend(updates)
+                spikes = [
+                    spike
+                    for spike in neuron.spike_queue
+                    if id(spike.origin_neuron) not in removed
+                ]
+                if len(spikes) != len(neuron.spike_queue):
+                    neuron.spike_queue[:] = spikes
+                    heapq.heapify(neuron.spike_queue)
+            logger.debug(f"Removed {len(dead)} dead neurons from {self.name}")
+
+        mapping = {neuron_id: neuron_id for neuron_id in self.neurons}
+        if renumber:
+            mapping = self._renumber()
+        active = [neuron for neuron in self.neurons.values() if not neuron.frozen]
+        self._active_neurons = None if len(active) == len(self.neurons) else active
+        return mapping
+
+    def _renumber(self) -> Dict[int, int]:
+        """Renumber the neurons to the contiguous ids 0..n-1, keeping their order"""
+        mapping = {
+            neuron_id: new_id for new_id, neuron_id in enumerate(sorted(self.neurons))
+        }
+        neurons = {}
+        for neuron_id in sorted(self.neurons):
+            neuron = self.neurons[neuron_id]
+            neuron.id = mapping[neuron_id]
+            # a new dict, the old one may be shared with other networks (NetworkPolicy)
+            neuron.synapses = Synapses(
+                (mapping[post_id], w) for post_id, w in neuron.synapses.items()
+            )
+            for weight_update in neuron.update_queue:
+                weight_update.post_id = mapping[weight_update.post_id]
+            for spike in neuron.spike_queue:
+                spike.dest_id = neuron.id
+            neurons[neuron.id] = neuron
+        self.neurons = neurons
+        self.neuron_connections = {
+            mapping[neuron_id]: [mapping[post_id] for post_id in connections]
+            for neuron_id, connections in self.neuron_connections.items()
+        }
+        self.input_list = [mapping[neuron_id] for neuron_id in self.input_list]
+        self.output_list = [mapping[neuron_id] for neuron_id in self.output_list]
+        self._weight_blocks = {}
+        return mapping
+
+    def pending_spikes(self) -> int:
+        """Total number of spikes waiting in the spike queues of all neurons"""
+        return sum(len(neuron.spike_queue) for neuron in self.neurons.values())
+
+    def get_overflow_stats(self) -> Dict[str, int]:
+        """Number of spikes and weight updates lost or merged at full queues"""
+        stats = {"dropped_spikes": 0, "coalesced_spikes": 0, "dropped_updates": 0}
+        for neuron in self.neurons.values():
+            stats["dropped_spikes"] += neuron.dropped_spikes
+            stats["coalesced_spikes"] += neuron.coalesced_spikes
+            stats["dropped_updates"] += neuron.dropped_updates
+        return stats
+
+    def snapshot_weights(self) -> WeightSnapshot:
+        """Take a copy-on-write snapshot of all synapse weights.
+        Only neurons whose synapses changed since the last snapshot are copied,
+        all other neurons share their frozen synapses with the previous snapshot.
+        """
+        blocks = {}
+        cache = {}
+        for neuron_id, neuron in self.neurons.items():
+            synapses = neuron.synapses
+            version = synapses.version if isinstance(synapses, Synapses) else None
+            cached = self._weight_blocks.get(neuron_id)
+            if (
+                cached is not None
+                and version is not None
+                and cached[0] is synapses
+                and cached[1] == version
+            ):
+                block = cached[2]
+            else:
+                block = freeze_synapses(synapses)
+            cache[neuron_id] = (synapses, version, block)
+            blocks[neuron_id] = block
+        self._weight_blocks = cache
+        return WeightSnapshot(blocks, time=self.period_start_time)
+
+    def get_weight_matrix(self) -> Tuple[csr_matrix, np.ndarray]:
+        """Export all synapse weights as one sparse matrix
+        Returns:
+            (weights, neuron_ids) where weights[i, j] is the weight of the synapse
+            from neuron_ids[i] to neuron_ids[j]
+        """
+        return self.snapshot_weights().to_sparse()
+
+    def get_activation_encoding(self, neuron_id: int) -> List:
+        """Absolute spike times of a neuron in the current period"""
+        return [
+            self.time_origin + spike_time
+            for spike_time in self.neurons[neuron_id].get_activation_encoding()
+        ]
+
+    def get_time_of_last_activation(self, neuron_id: int):
+        """Absolute time of the last activation of a neuron"""
+        return self.time_origin + self.neurons[neuron_id].get_time_of_last_activation()
 
     def get_output(self) -> np.array:
         """Gets the activations of the output neurons"""
@@ -1,5 +1,6 @@
 import numpy as np
 import heapq
+from collections import deque
 from typing import Iterator
 from neuron_net.src.math.spiking_algorithms import (
     calc_spike_time,
@@ -7,6 +8,7 @@ from neuron_net.src.math.spiking_algorithms import (
     calc_next_potential,
 )
 from neuron_net.src.models.Spike import Spike
+from neuron_net.src.models.Synapses import Synapses
 from neuron_net.src.models.WeightUpdate import WeightUpdate
 import logging
 import neuron_net.src.math.constants as constants
@@ -28,6 +30,11 @@ class Neuron:
         threshold=0.15,
         gamma=200,
         synapses=None,
+        spike_queue_capacity=None,
+        update_queue_capacity=None,
+        overflow_policy=constants.DROP_OLDEST,
+        coalesce_bin=1.0,
+        integration_bin=None,
     ):
         """Initialize a Neuron
         Args:
@@ -39,8 +46,21 @@ class Neuron:
             tau: time constant
             threshold: threshold for activation
             gamma: refractory period
-            synapses: dictionary of connected neurons (post_neuron_id: weight)
+            synapses: dictionary of connected neurons (post_neuron_id: weight). It is
+                copied into a Synapses dict, later changes to it are not seen by the neuron.
+            spike_queue_capacity: maximum number of queued spikes, None for unbounded
+            update_queue_capacity: maximum number of queued weight updates, None for unbounded.
+                The oldest weight update is dropped when the queue is full.
+            overflow_policy: what to do with a spike arriving at a full spike queue
+                (constants.DROP_OLDEST, constants.DROP_WEAKEST or constants.COALESCE)
+            coalesce_bin: width of the time bins used by the COALESCE policy
+            integration_bin: if set, spikes arriving within this time of each other are
+                integrated as one summed spike (see calc_binned_potential_error), None for exact
         """
+        if overflow_policy not in constants.OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy {overflow_policy}, expected one of {constants.OVERFLOW_POLICIES}"
+            )
         self.id = id
 
         # Neuron parameters
@@ -52,6 +72,9 @@ class Neuron:
         # Neuron info
         self._is_input = is_input
         self._is_output = is_output
+        # frozen neurons are skipped by the network and drop incoming spikes
+        self.frozen = False
+        self.frozen_drops = 0
 
         # Neuron state
         self._V_rest = rest
@@ -67,12 +90,26 @@ class Neuron:
         if synapses is None:
             synapses = {}
 
-        self.synapses = (
-            synapses  # dictionary of connected neurons (post_neuron_id: weight)
-        )
-        self.update_queue = []  # unordered queue for weight updates
+        self.synapses = Synapses(
+            synapses
+        )  # dictionary of connected neurons (post_neuron_id: weight)
+        self.update_queue = deque(
+            maxlen=update_queue_capacity
+        )  # unordered queue for weight updates
         self.spike_queue = []  # priority queue for spike events
 
+        # queue limits
+        self.spike_queue_capacity = spike_queue_capacity
+        self.overflow_policy = overflow_policy
+        self.coalesce_bin = coalesce_bin
+        self.dropped_spikes = 0
+        self.coalesced_spikes = 0
+        self.dropped_updates = 0
+
+        # time binned integration
+        self.integration_bin = integration_bin
+        self.merged_spikes = 0
+
     def __str__(self):
         neuron_type = (
             "INPUT" if self._is_input else "OUTPUT" if self._is_output else "HIDDEN"
@@ -118,7 +155,41 @@ class Neuron:
         Args:
             Spike: (origin, time_sent, time received, strength)
         """
-        heapq.heappush(self.spike_queue, incoming_spike)
+        if (
+            self.spike_queue_capacity is not None
+            and len(self.spike_queue) >= self.spike_queue_capacity
+        ):
+            self.shed_spike(incoming_spike)
+        else:
+            heapq.heappush(self.spike_queue, incoming_spike)
+
+    def shed_spike(self, incoming_spike: Spike):
+        """Accept a spike without growing the spike queue, following the overflow policy.
+        COALESCE adds the strength of the incoming spike to a queued spike in the same
+        time bin (the queued spike keeps its origin for weight updates). If there is no
+        such spike it falls back to DROP_OLDEST.
+        Args:
+            Spike: (origin, time_sent, time received, strength)
+        """
+        queue = self.spike_queue
+        if self.overflow_policy == constants.COALESCE:
+            time_bin = incoming_spike.time_received // self.coalesce_bin
+            for spike in queue:
+                if spike.time_received // self.coalesce_bin == time_bin:
+                    spike.strength += incoming_spike.strength
+                    self.coalesced_spikes += 1
+                    return
+        self.dropped_spikes += 1
+        if not queue:
+            return
+        if self.overflow_policy == constants.DROP_WEAKEST:
+            weakest = min(range(len(queue)), key=lambda idx: queue[idx].strength)
+            if queue[weakest].strength < incoming_spike.strength:
+                queue[weakest] = incoming_spike
+                heapq.heapify(queue)
+        elif queue[0].time_received <= incoming_spike.time_received:
+            # the earliest queued spike is replaced, otherwise the incoming spike is the oldest
+            heapq.heapreplace(queue, incoming_spike)
 
     def receive_weight_update(self, receiver_id: int, delta_t):
         """Queue a weight update event rom a post-synaptic neuron
@@ -130,10 +201,16 @@ class Neuron:
             raise ValueError(
                 f"[{self.id}] Neuron with id {receiver_id} not found in synapses."
             )
+        if len(self.update_queue) == self.update_queue.maxlen:
+            self.dropped_updates += 1
         self.update_queue.append(WeightUpdate(receiver_id, delta_t))
 
     def process_spikes(
-        self, time_cutoff: np.uint64, period_start_time, clock_period=100
+        self,
+        time_cutoff: np.uint64,
+        period_start_time,
+        clock_period=100,
+        time_origin=0,
     ) -> Iterator[Spike]:
         """Process all the spikes currently in the spike queue.
         Importantly, spikes do not represent information without the context of spike timing.
@@ -142,6 +219,8 @@ class Neuron:
             time_cutoff: time to process spikes until
             period_start_time: start time of the current period. Used for time based encoding.
             clock_period: period of the clock cycle
+            time_origin: absolute time of the local time 0 of the times in this neuron.
+                Spike strengths are computed from the absolute times.
         Yields:
             Spike: a spike event going to a post-synaptic neuron
         """
@@ -151,6 +230,8 @@ class Neuron:
         logger.debug("Resetting spike counter")
         self.curr_spikes = []
         self._num_spikes = 0
+        # summed as integers first, so it stays exact for any time_origin
+        period_phase = (period_start_time + time_origin) / clock_period
         while self.spike_queue:
             if self.spike_queue[0].time_received > time_cutoff:
                 break
@@ -164,12 +245,27 @@ class Neuron:
                 # neuron is still in refractory
                 delta = self._time_of_last_activation - spike.time_received
                 if not self._is_input:
-                    spike.origin_neuron.receive_weight_update(self.id, delta)
+                    self._notify(spike.origin_neuron, delta)
                 continue
 
+            arrivals = [spike]
+            strength = spike.strength
+            if self.integration_bin is not None:
+                # merge the spikes arriving within integration_bin of this one
+                while (
+                    self.spike_queue
+                    and self.spike_queue[0].time_received
+                    < spike.time_received + self.integration_bin
+                    and self.spike_queue[0].time_received <= time_cutoff
+                ):
+                    arrival = heapq.heappop(self.spike_queue)
+                    arrivals.append(arrival)
+                    strength += arrival.strength
+                self.merged_spikes += len(arrivals) - 1
+
             # calculate amount of decay before spike
             self._V = calc_next_potential(
-                spike.strength,
+                strength,
                 self.tau,
                 spike.time_received,
                 self._time_of_last_update,
@@ -194,15 +290,22 @@ class Neuron:
                 self.curr_spikes.append(spike)
                 self._num_spikes += 1
                 self._time_of_last_activation = spike.time_received
-                # notify pre-synaptic neuron of spike
+                # notify pre-synaptic neurons of spike
                 if not self._is_input:
-                    spike.origin_neuron.receive_weight_update(
-                        self.id, spike.time_received - spike.time_sent
+                    self._notify(
+                        spike.origin_neuron, spike.time_received - spike.time_sent
                     )
+                    # merged arrivals come after the activation, as on the exact
+                    # path they fall in the refractory period and are depressed
+                    for arrival in arrivals[1:]:
+                        self._notify(
+                            arrival.origin_neuron,
+                            self._time_of_last_activation - arrival.time_received,
+                        )
                 # Spike next neurons, nothing happens if is_output neuron
                 for neuron_id, weight in self.synapses.items():
                     # Calculate the time of the spike for all post-synaptic neurons
-                    phase_ratio = spike.time_received - period_start_time / clock_period
+                    phase_ratio = spike.time_received + time_origin - period_phase
                     yield Spike(
                         self,
                         neuron_id,
@@ -215,14 +318,27 @@ class Neuron:
                     )
                 self._V = self._V_rest
             else:
-                self._V += spike.strength
+                self._V += strength
 
             self._time_of_last_update = spike.time_received
 
+    def _notify(self, origin_neuron: "Neuron", delta_t):
+        """Send a weight update to a pre-synaptic neuron.
+        The synapse may have been pruned while the spike was in flight, either by an
+        earlier update of the same neuron or by a network sharing its synapses, then
+        there is nothing left to update.
+        """
+        if self.id in origin_neuron.synapses:
+            origin_neuron.receive_weight_update(self.id, delta_t)
+
     def process_weight_updates(self) -> None:
-        """Update all weights in the queue"""
+        """Update all weights in the queue.
+        Updates for synapses that were pruned since they were queued are skipped.
+        """
         while self.update_queue:
             weight_update = self.update_queue.pop()
+            if weight_update.post_id not in self.synapses:
+                continue
             new_weight = calc_weight_update(
                 self.synapses[weight_update.post_id], weight_update.delta_t
             )
@@ -230,3 +346,20 @@ class Neuron:
             if new_weight < 0:
                 # pruning
                 del self.synapses[weight_update.post_id]
+
+    def rebase_time(self, shift):
+        """Move every time stored in this neuron shift earlier, for a new local time 0.
+        The time of the last update is clamped, a potential that decayed for 1000 tau
+        is 0 in float64 so the result is the same. The time of the last activation is
+        kept exact, it is reported (see Network.get_time_of_last_activation).
+        Args:
+            shift: the amount the local time 0 moves forward
+        """
+        for spike in self.spike_queue:
+            spike.rebase_time(shift)
+        for spike in self.curr_spikes:
+            spike.rebase_time(shift)
+        self._time_of_last_update = max(
+            self._time_of_last_update - shift, -1000 * self.tau
+        )
+        self._time_of_last_activation -= shift
@@ -1,4 +1,6 @@
 class Spike:
+    __slots__ = ("origin_neuron", "dest_id", "time_sent", "time_received", "strength")
+
     def __init__(self, origin_neuron, dest_id, time_sent, time_received, strength=1.0):
         """A spike event between two neurons
         Args:
@@ -13,6 +15,12 @@ class Spike:
         self.time_received = time_received
         self.strength = strength
 
+    def rebase_time(self, shift):
+        """Move the times of this spike shift earlier"""
+        self.time_received -= shift
+        if self.time_sent is not None:
+            self.time_sent -= shift
+
     def __lt__(self, other):
         return self.time_received < other.time_received
 
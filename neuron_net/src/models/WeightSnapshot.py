@@ -0,0 +1,151 @@
+from typing import Dict, Tuple
+from scipy.sparse import csr_matrix
+import numpy as np
+
+# (post_neuron_ids, weights) of one neuron, both sorted by post_neuron_id and read only
+SynapseBlock = Tuple[np.ndarray, np.ndarray]
+
+CHANGED_DTYPE = np.dtype(
+    [("pre", np.int64), ("post", np.int64), ("old", np.float64), ("new", np.float64)]
+)
+SYNAPSE_DTYPE = np.dtype(
+    [("pre", np.int64), ("post", np.int64), ("weight", np.float64)]
+)
+
+
+def freeze_synapses(synapses: Dict[int, float]) -> SynapseBlock:
+    """Copy the synapses of a neuron into read only arrays sorted by post_neuron_id"""
+    post_ids = np.fromiter(synapses.keys(), dtype=np.int64, count=len(synapses))
+    weights = np.fromiter(synapses.values(), dtype=np.float64, count=len(synapses))
+    order = np.argsort(post_ids, kind="stable")
+    post_ids, weights = post_ids[order], weights[order]
+    post_ids.flags.writeable = False
+    weights.flags.writeable = False
+    return post_ids, weights
+
+
+class WeightSnapshot:
+    """The synapse weights of a whole network at one point in time.
+    Snapshots are copy-on-write: the per-neuron blocks are read only arrays that
+    are shared with earlier snapshots for every neuron whose synapses did not change.
+    """
+
+    def __init__(self, blocks: Dict[int, SynapseBlock], time=None):
+        """Initialize a snapshot
+        Args:
+            blocks: dictionary of frozen synapses (neuron_id: (post_neuron_ids, weights))
+            time: simulation time the snapshot was taken at
+        """
+        self.blocks = blocks
+        self.time = time
+
+    def __len__(self):
+        return sum(len(post_ids) for post_ids, _ in self.blocks.values())
+
+    def __repr__(self):
+        return f"<WeightSnapshot: {len(self.blocks)} neurons, {len(self)} synapses at {self.time}>"
+
+    def neuron_ids(self) -> np.ndarray:
+        """Sorted ids of the neurons, row i and column i of to_sparse belong to neuron_ids()[i]"""
+        return np.array(sorted(self.blocks), dtype=np.int64)
+
+    def to_sparse(self) -> Tuple[csr_matrix, np.ndarray]:
+        """Build the weight matrix of the snapshot
+        Returns:
+            (weights, neuron_ids) where weights[i, j] is the weight of the synapse
+            from neuron_ids[i] to neuron_ids[j]
+        """
+        ids = self.neuron_ids()
+        n = len(ids)
+        blocks = [self.blocks[neuron_id] for neuron_id in ids.tolist()]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(post_ids) for post_ids, _ in blocks], out=indptr[1:])
+        if blocks:
+            post_ids = np.concatenate([block[0] for block in blocks])
+            data = np.concatenate([block[1] for block in blocks])
+        else:
+            post_ids = np.zeros(0, dtype=np.int64)
+            data = np.zeros(0, dtype=np.float64)
+        columns = np.searchsorted(ids, post_ids)
+        if len(post_ids) and (
+            columns.max() >= n or not np.array_equal(ids[columns], post_ids)
+        ):
+            raise ValueError(
+                "Snapshot contains synapses to neurons outside the network"
+            )
+        return csr_matrix((data, columns, indptr), shape=(n, n)), ids
+
+
+class WeightDiff:
+    """Differences between two weight snapshots.
+    changed holds (pre, post, old, new) for synapses whose weight changed,
+    pruned holds (pre, post, weight) for synapses only in the old snapshot and
+    new holds (pre, post, weight) for synapses only in the new snapshot.
+    """
+
+    def __init__(self, changed: np.ndarray, pruned: np.ndarray, new: np.ndarray):
+        self.changed = changed
+        self.pruned = pruned
+        self.new = new
+
+    def __len__(self):
+        return len(self.changed) + len(self.pruned) + len(self.new)
+
+    def __repr__(self):
+        return (
+            f"<WeightDiff: {len(self.changed)} changed, {len(self.pruned)} pruned, "
+            f"{len(self.new)} new>"
+        )
+
+
+def diff_snapshots(old: WeightSnapshot, new: WeightSnapshot, atol=0.0) -> WeightDiff:
+    """Compare two weight snapshots.
+    Blocks shared by both snapshots are skipped without looking at their weights.
+    Args:
+        old: earlier snapshot
+        new: later snapshot
+        atol: weight changes up to this size are not reported
+    Returns:
+        WeightDiff with the changed, pruned and new synapses
+    """
+    changed, pruned, added = [], [], []
+    empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+    for neuron_id in sorted(old.blocks.keys() | new.blocks.keys()):
+        old_block = old.blocks.get(neuron_id, empty)
+        new_block = new.blocks.get(neuron_id, empty)
+        if old_block is new_block:
+            continue
+        old_post, old_weights = old_block
+        new_post, new_weights = new_block
+        _, old_idx, new_idx = np.intersect1d(
+            old_post, new_post, assume_unique=True, return_indices=True
+        )
+        delta = np.abs(new_weights[new_idx] - old_weights[old_idx]) > atol
+        if delta.any():
+            block = np.empty(np.count_nonzero(delta), dtype=CHANGED_DTYPE)
+            block["pre"] = neuron_id
+            block["post"] = old_post[old_idx[delta]]
+            block["old"] = old_weights[old_idx[delta]]
+            block["new"] = new_weights[new_idx[delta]]
+            changed.append(block)
+        for post, weights, idx, target in (
+            (old_post, old_weights, old_idx, pruned),
+            (new_post, new_weights, new_idx, added),
+        ):
+            missing = np.ones(len(post), dtype=bool)
+            missing[idx] = False
+            if missing.any():
+                block = np.empty(np.count_nonzero(missing), dtype=SYNAPSE_DTYPE)
+                block["pre"] = neuron_id
+                block["post"] = post[missing]
+                block["weight"] = weights[missing]
+                target.append(block)
+    return WeightDiff(
+        _concat(changed, CHANGED_DTYPE),
+        _concat(pruned, SYNAPSE_DTYPE),
+        _concat(added, SYNAPSE_DTYPE),
+    )
+
+
+def _concat(blocks, dtype) -> np.ndarray:
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=dtype)
@@ -2,6 +2,8 @@ import numpy as np
 
 
 class WeightUpdate:
+    __slots__ = ("delta_t", "post_id")
+
     def __init__(self, post_id: int, delta_t: np.uint64):
         """A weight update event between two neurons
         Args:
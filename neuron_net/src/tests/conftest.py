@@ -1,3 +1,4 @@
+from neuron_net.src.models.Network import Network
 import pytest
 import logging
 
@@ -16,3 +17,45 @@ def setup_logging():
 
     # Set package loggers
     logging.getLogger("neuron_net").setLevel(logging.DEBUG)
+
+
+@pytest.fixture
+def network_linear():
+    """
+    0 -> 1 -> 2 -> 3
+    """
+    net1_config = {
+        "connections": {
+            0: [1],
+            1: [2],
+            2: [3],
+            3: [],
+        },
+        "input_list": [0],
+        "output_list": [3],
+    }
+
+    period = 100
+    return Network(
+        net1_config["connections"],
+        net1_config["input_list"],
+        net1_config["output_list"],
+        period_start_time=1000,
+        clock_cycle_period=period,
+        name="clocked_network_linear",
+    )
+
+
+@pytest.fixture
+def network_dead_ends():
+    """
+    0 -> 1 -> 3-(out)
+    |    ^
+    2 ---|     4 -> 5   6 <- 1
+    """
+    return Network(
+        {0: [1, 2], 1: [3, 6], 2: [1], 3: [], 4: [5], 5: [], 6: []},
+        [0],
+        [3],
+        period_start_time=1000,
+    )
@@ -0,0 +1,53 @@
+from neuron_net.src.math.graph_analysis import (
+    build_adjacency,
+    clustering_coefficients,
+    find_dead_neurons,
+    input_output_latencies,
+    reachable,
+)
+import numpy as np
+import pytest
+
+
+def test_build_adjacency(network_dead_ends):
+    delays, ids = build_adjacency(network_dead_ends)
+    assert ids.tolist() == list(range(7))
+    assert delays.nnz == 6
+    assert delays[0, 1] == pytest.approx(20)
+    network_dead_ends.neurons[0].synapses[1] = 0.5
+    assert build_adjacency(network_dead_ends)[0][0, 1] == pytest.approx(50)
+    assert build_adjacency(network_dead_ends, use_synapses=False)[0][
+        0, 1
+    ] == pytest.approx(20)
+
+
+def test_reachable(network_dead_ends):
+    delays, _ = build_adjacency(network_dead_ends)
+    assert np.flatnonzero(reachable(delays, [0])).tolist() == [0, 1, 2, 3, 6]
+    assert np.flatnonzero(reachable(delays, [3], reverse=True)).tolist() == [0, 1, 2, 3]
+
+
+def test_input_output_latencies(network_dead_ends):
+    network_dead_ends.neurons[0].synapses[1] = 0.5
+    latencies = input_output_latencies(network_dead_ends)
+    assert latencies.shape == (1, 1)
+    # 0 -> 2 -> 1 -> 3 is faster than the weakened 0 -> 1 synapse
+    assert latencies[0, 0] == pytest.approx(60)
+    del network_dead_ends.neurons[1].synapses[3]
+    assert np.isinf(input_output_latencies(network_dead_ends)[0, 0])
+
+
+def test_clustering_coefficients(network_dead_ends):
+    delays, _ = build_adjacency(network_dead_ends)
+    coefficients = clustering_coefficients(delays)
+    # 0, 1 and 2 form a triangle
+    assert coefficients[0] == pytest.approx(1.0)
+    assert coefficients[2] == pytest.approx(1.0)
+    assert coefficients[1] == pytest.approx(1 / 6)
+    assert coefficients[4] == 0
+
+
+def test_find_dead_neurons(network_dead_ends):
+    assert find_dead_neurons(network_dead_ends) == [4, 5, 6]
+    del network_dead_ends.neurons[2].synapses[1]
+    assert find_dead_neurons(network_dead_ends) == [2, 4, 5, 6]
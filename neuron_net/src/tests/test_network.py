@@ -1,37 +1,12 @@
 from neuron_net.src.models.Neuron import Neuron
 from neuron_net.src.models.Network import Network
+from neuron_net.src.models.Spike import Spike
 import numpy as np
+import copy
 import logging
 import pytest
 
 
-@pytest.fixture
-def network_linear():
-    """
-    0 -> 1 -> 2 -> 3
-    """
-    net1_config = {
-        "connections": {
-            0: [1],
-            1: [2],
-            2: [3],
-            3: [],
-        },
-        "input_list": [0],
-        "output_list": [3],
-    }
-
-    period = 100
-    return Network(
-        net1_config["connections"],
-        net1_config["input_list"],
-        net1_config["output_list"],
-        period_start_time=1000,
-        clock_cycle_period=period,
-        name="clocked_network_linear",
-    )
-
-
 @pytest.fixture
 def network_tree():
     """
@@ -226,3 +201,188 @@ def test_get_output(network_linear, caplog):
     rep = network_linear.get_output()
     logging.debug("HEOYYYY")
     logging.debug(rep)
+
+
+def test_network_queue_capacity():
+    network = Network(
+        {0: [1, 2], 1: [3], 2: [1], 3: []},
+        [0],
+        [3],
+        period_start_time=1000,
+        spike_queue_capacity=1,
+    )
+    network.send_input_data([(0, 0.5)], 1030)
+    network.send_input_data([(0, 2.0)], 1090)
+    assert len(network.neurons[0].spike_queue) == 1
+    assert network.get_overflow_stats()["dropped_spikes"] == 1
+
+
+def test_network_max_total_spikes():
+    network = Network(
+        {0: [1], 1: [], 2: []},
+        [0, 2],
+        [1],
+        period_start_time=1000,
+        max_total_spikes=2,
+    )
+    network.send_input_data([(0, 1.0), (2, 1.0)], 1150)
+    network.send_input_data([(0, 1.0), (2, 1.0)], 1160)
+    assert network.pending_spikes() == 2
+    assert network.get_overflow_stats()["dropped_spikes"] == 2
+
+
+def test_eliminate_dead_neurons(network_dead_ends):
+    network_dead_ends.neurons[4].receive_spike(Spike(None, 4, None, 1050))
+    network_dead_ends.neurons[1].receive_spike(
+        Spike(network_dead_ends.neurons[4], 1, 1000, 1050)
+    )
+    mapping = network_dead_ends.eliminate_dead_neurons()
+    assert sorted(network_dead_ends.neurons) == [0, 1, 2, 3]
+    assert mapping == {0: 0, 1: 1, 2: 2, 3: 3}
+    assert network_dead_ends.neurons[1].synapses == {3: 0.2}
+    assert network_dead_ends.neuron_connections[1] == [3]
+    # spikes sent by removed neurons are dropped
+    assert len(network_dead_ends.neurons[1].spike_queue) == 0
+
+
+def test_eliminate_dead_neurons_renumber():
+    network = Network({10: [30], 20: [], 30: [40], 40: []}, [10], [40])
+    network.neurons[30].receive_spike(Spike(None, 30, None, 50))
+    mapping = network.eliminate_dead_neurons(renumber=True)
+    assert mapping == {10: 0, 30: 1, 40: 2}
+    assert list(network.neurons) == [0, 1, 2]
+    assert network.neurons[0].synapses == {1: 0.2}
+    assert network.neurons[1].id == 1
+    assert network.neurons[1].spike_queue[0].dest_id == 1
+    assert network.input_list == [0]
+    assert network.output_list == [2]
+
+
+def test_renumber_keeps_shared_synapses():
+    network = Network({10: [30], 20: [], 30: [40], 40: []}, [10], [40])
+    replica = copy.deepcopy(network)
+    for neuron_id, neuron in replica.neurons.items():
+        neuron.synapses = network.neurons[neuron_id].synapses
+    replica.eliminate_dead_neurons(renumber=True)
+    assert replica.neurons[0].synapses == {1: 0.2}
+    assert network.neurons[10].synapses == {30: 0.2}
+
+
+def test_freeze_dead_neurons(network_dead_ends):
+    network_dead_ends.eliminate_dead_neurons(freeze=True)
+    assert len(network_dead_ends.neurons) == 7
+    assert [n for n, neuron in network_dead_ends.neurons.items() if neuron.frozen] == [
+        4,
+        5,
+        6,
+    ]
+    network_dead_ends.send_input_data([(0, 1.0)], 1080)
+    network_dead_ends.update(1100)
+    network_dead_ends.update(1200)
+    # the spike from 1 to 6 was dropped at the frozen neuron
+    assert len(network_dead_ends.neurons[6].spike_queue) == 0
+    assert network_dead_ends.neurons[6].frozen_drops == 1
+    assert network_dead_ends.get_overflow_stats()["dropped_spikes"] == 0
+
+
+def test_periodic_dead_neuron_elimination():
+    network = Network(
+        {0: [1], 1: [], 2: []},
+        [0],
+        [1],
+        period_start_time=1000,
+        dead_neuron_interval=2,
+    )
+    network.update(1100)
+    assert len(network.neurons) == 3
+    network.update(1200)
+    assert sorted(network.neurons) == [0, 1]
+
+
+def _run_cycles(network, cycles, offset=30):
+    outputs = []
+    for cycle in range(cycles):
+        start = network.period_start_time
+        network.send_input_data([(0, 1.0)], start + offset)
+        network.update(start + network.clock_cycle_period)
+        outputs.append(network.get_output().tolist())
+    return outputs
+
+
+@pytest.mark.parametrize("offset", [30, 1])
+def test_rebase_time_matches_absolute_time(offset):
+    config = ({0: [1], 1: [2], 2: [3], 3: []}, [0], [3])
+    absolute = Network(*config, period_start_time=1000)
+    rebased = Network(
+        *config, period_start_time=1000, rebase_time=True, rebase_threshold=0
+    )
+    outputs = _run_cycles(absolute, 8, offset)
+    assert np.allclose(_run_cycles(rebased, 8, offset), outputs)
+    if offset == 1:
+        # the spike strengths grow with the absolute time and make neuron 3 fire
+        assert [int(output[0] > 1) for output in outputs] == [0, 0, 1, 0, 1, 0, 1, 0]
+    assert rebased.period_start_time == absolute.period_start_time == 1800
+    assert rebased.time_origin == 1800
+    for neuron_id, neuron in rebased.neurons.items():
+        assert neuron.get_num_spikes() == absolute.neurons[neuron_id].get_num_spikes()
+        assert neuron.synapses == pytest.approx(absolute.neurons[neuron_id].synapses)
+        assert rebased.get_time_of_last_activation(neuron_id) == pytest.approx(
+            absolute.get_time_of_last_activation(neuron_id)
+        )
+        assert rebased.get_activation_encoding(neuron_id) == pytest.approx(
+            absolute.get_activation_encoding(neuron_id)
+        )
+        assert [spike.strength for spike in neuron.curr_spikes] == pytest.approx(
+            [spike.strength for spike in absolute.neurons[neuron_id].curr_spikes]
+        )
+        # only times close to the current period are stored
+        for spike in neuron.spike_queue:
+            assert 0 <= spike.time_received <= 2 * rebased.clock_cycle_period
+
+
+def test_rebase_time_threshold():
+    config = ({0: [1], 1: [2], 2: [3], 3: []}, [0], [3])
+    network = Network(
+        *config, period_start_time=1000, rebase_time=True, rebase_threshold=250
+    )
+    assert network.time_origin == 1000
+    _run_cycles(network, 2)
+    # the period start is 200 from time_origin, below the threshold
+    assert network.time_origin == 1000
+    _run_cycles(network, 1)
+    assert network.time_origin == 1300
+
+
+def test_rebase_time_long_horizon():
+    start = 2**60
+    network = Network(
+        {0: [1], 1: [2], 2: [3], 3: []},
+        [0],
+        [3],
+        period_start_time=start,
+        rebase_time=True,
+        rebase_threshold=0,
+    )
+    network.send_input_data([(0, 1.0)], start + 80)
+    network.update(start + 100)
+    # spike times stay exact even though start + 100 is not a float64
+    assert network.neurons[1].get_activation_encoding() == [0]
+    network.update(start + 200)
+    # times of the previous period are negative after rebasing
+    assert network.neurons[2].get_activation_encoding() == [-80]
+    assert network.neurons[3].get_activation_encoding() == [-60]
+    activation = network.neurons[3].get_time_of_last_activation()
+    assert int(activation) + network.time_origin == start + 140
+    assert network.get_output().tolist() == [0.4]
+    # spike strengths are those of the absolute times
+    assert network.neurons[3].curr_spikes[0].strength == pytest.approx(
+        0.2 * (start + 140 - (start + 100) / 100)
+    )
+
+
+def test_rebase_time_clock():
+    network = Network({0: [1], 1: []}, [0], [1], rebase_time=True, rebase_threshold=0)
+    network.send_input_data([(0, 1.0)], 5080)
+    network.clock(5000)
+    assert network.time_origin == 5000
+    assert network.neurons[0].spike_queue[0].time_received == 80
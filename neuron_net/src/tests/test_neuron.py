@@ -1,7 +1,10 @@
 from neuron_net.src.models.Neuron import Neuron
 from neuron_net.src.models.Spike import Spike
+from neuron_net.src.math.spiking_algorithms import calc_binned_potential_error
+import numpy as np
 import pytest
 import logging
+import neuron_net.src.math.constants as constants
 
 """Testing the core functionality of the Neuron Class:
 - Adding synapses to a neuron
@@ -118,6 +121,17 @@ def test_receive_weight_update_(neuron):
         neuron.receive_weight_update(1, delta_t=0.1)
 
 
+def test_spike_from_pruned_synapse(neuron):
+    # the synapse is pruned while its spike is in flight
+    n_1 = Neuron(1)
+    n_1.add_synapse(0, weight=0.2)
+    neuron.receive_spike(Spike(n_1, 0, time_sent=999, time_received=1011, strength=3.0))
+    del n_1.synapses[0]
+    spikes = list(neuron.process_spikes(time_cutoff=1100, period_start_time=1000))
+    assert neuron.get_num_spikes() == 1
+    assert len(n_1.update_queue) == 0
+
+
 def test_process_spikes_no_spike(neuron, caplog):
     caplog.set_level(logging.DEBUG)
     n_1 = Neuron(1)
@@ -143,3 +157,92 @@ def test_process_weight_updates(neuron):
 def test_neuron_str_repr(neuron):
     assert str(neuron) == "[HIDDEN Neuron 0] V=0.0mV, 0 connections: []"
     assert repr(neuron) == "[HIDDEN Neuron 0] V=0.0mV, 0 connections: []"
+
+
+def test_spike_queue_drop_oldest():
+    neuron = Neuron(0, spike_queue_capacity=2)
+    neuron.receive_spike(Spike(None, 0, None, time_received=1010))
+    neuron.receive_spike(Spike(None, 0, None, time_received=1020))
+    neuron.receive_spike(Spike(None, 0, None, time_received=1030))
+    assert len(neuron.spike_queue) == 2
+    assert sorted(s.time_received for s in neuron.spike_queue) == [1020, 1030]
+    # an incoming spike older than everything queued is the one dropped
+    neuron.receive_spike(Spike(None, 0, None, time_received=1000))
+    assert sorted(s.time_received for s in neuron.spike_queue) == [1020, 1030]
+    assert neuron.dropped_spikes == 2
+
+
+def test_spike_queue_drop_weakest():
+    neuron = Neuron(0, spike_queue_capacity=2, overflow_policy=constants.DROP_WEAKEST)
+    neuron.receive_spike(Spike(None, 0, None, time_received=1010, strength=0.5))
+    neuron.receive_spike(Spike(None, 0, None, time_received=1020, strength=2.0))
+    neuron.receive_spike(Spike(None, 0, None, time_received=1030, strength=1.0))
+    assert sorted(s.strength for s in neuron.spike_queue) == [1.0, 2.0]
+    neuron.receive_spike(Spike(None, 0, None, time_received=1040, strength=0.1))
+    assert sorted(s.strength for s in neuron.spike_queue) == [1.0, 2.0]
+    assert neuron.dropped_spikes == 2
+    assert neuron.spike_queue[0].time_received == 1020
+
+
+def test_spike_queue_coalesce():
+    neuron = Neuron(
+        0, spike_queue_capacity=1, overflow_policy=constants.COALESCE, coalesce_bin=10
+    )
+    neuron.receive_spike(Spike(None, 0, None, time_received=1011, strength=0.5))
+    neuron.receive_spike(Spike(None, 0, None, time_received=1019, strength=0.25))
+    assert len(neuron.spike_queue) == 1
+    assert neuron.spike_queue[0].strength == 0.75
+    assert neuron.coalesced_spikes == 1
+    # different bin falls back to dropping the oldest
+    neuron.receive_spike(Spike(None, 0, None, time_received=1020, strength=1.0))
+    assert neuron.spike_queue[0].time_received == 1020
+    assert neuron.dropped_spikes == 1
+
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        Neuron(0, overflow_policy="drop_everything")
+
+
+def test_update_queue_capacity():
+    neuron = Neuron(0, update_queue_capacity=2)
+    neuron.add_synapse(1, weight=0.2)
+    for delta_t in [1, 2, 3]:
+        neuron.receive_weight_update(1, delta_t=delta_t)
+    assert len(neuron.update_queue) == 2
+    assert [u.delta_t for u in neuron.update_queue] == [2, 3]
+    assert neuron.dropped_updates == 1
+
+
+def test_binned_integration_within_error_bound():
+    times = [1010, 1011, 1013, 1014]
+    strengths = [0.02, 0.03, 0.01, 0.02]
+    exact = Neuron(0, threshold=10)
+    binned = Neuron(0, threshold=10, integration_bin=5)
+    for n in (exact, binned):
+        n_1 = Neuron(1)
+        n_1.add_synapse(0, weight=0.2)
+        for time, strength in zip(times, strengths):
+            n.receive_spike(Spike(n_1, 0, 1000, time, strength=strength))
+        list(n.process_spikes(time_cutoff=1100, period_start_time=1000))
+    assert binned.merged_spikes == 3
+    # compare both at the time of the last arrival
+    binned_V = binned._V * np.exp(-(times[-1] - times[0]) / binned.tau)
+    bound = calc_binned_potential_error(sum(strengths), 5, binned.tau)
+    assert abs(exact._V - binned_V) <= bound
+    assert exact._V != binned_V
+
+
+def test_binned_integration_activation():
+    neuron = Neuron(0, integration_bin=5)
+    origins = [Neuron(1), Neuron(2)]
+    for origin, time in zip(origins, [1010, 1012]):
+        origin.add_synapse(0, weight=0.2)
+        neuron.receive_spike(Spike(origin, 0, 1000, time, strength=0.3))
+    neuron.receive_spike(Spike(origins[0], 0, 1000, 1030, strength=0.3))
+    list(neuron.process_spikes(time_cutoff=1100, period_start_time=1000))
+    assert neuron.get_num_spikes() == 1
+    assert neuron.get_time_of_last_activation() == 1010
+    # the first arrival is potentiated, the merged one is refractory as on the exact path
+    assert [u.delta_t for u in origins[0].update_queue] == [10, -20]
+    assert [u.delta_t for u in origins[1].update_queue] == [-2]
@@ -0,0 +1,140 @@
+from neuron_net.src.interfaces.StreamingPipeline import StreamingPipeline
+from neuron_net.src.interfaces.encoders import encode_observation
+import numpy as np
+import asyncio
+import threading
+import time
+import pytest
+
+
+def test_encode_observation():
+    assert encode_observation([0.0, 1.5, 2.0], [4, 5, 6]) == [(5, 1.5), (6, 2.0)]
+    assert encode_observation([0.5, 1.5], [4, 5], threshold=1.0) == [(5, 1.5)]
+    with pytest.raises(ValueError):
+        encode_observation([1.0], [4, 5])
+
+
+def test_step(network_linear):
+    pipeline = StreamingPipeline(network_linear, sink=print, input_offset=80)
+    output = pipeline.step([1.0])
+    assert output.shape == (1,)
+    assert network_linear.period_start_time == 1100
+    assert len(network_linear.neurons[1].curr_spikes) == 1
+
+
+def test_run(network_linear):
+    results = []
+    pipeline = StreamingPipeline(network_linear, sink=results.append, input_offset=80)
+    latencies = pipeline.run([[1.0], [0.0], [2.0]])
+    assert len(results) == 3
+    assert all(isinstance(r, np.ndarray) for r in results)
+    assert len(latencies) == 3
+    assert all(latency >= 0 for latency in latencies)
+    assert network_linear.period_start_time == 1300
+    assert pipeline.latency_summary()["count"] == 3
+
+
+def test_run_max_samples(network_linear):
+    results = []
+    pipeline = StreamingPipeline(network_linear, sink=results.append)
+    pipeline.run(iter(lambda: [1.0], None), max_samples=5)
+    assert len(results) == 5
+
+
+def test_backpressure_from_slow_sink(network_linear):
+    produced = []
+    consumed = []
+    lead = []
+
+    def source():
+        for i in range(20):
+            produced.append(i)
+            lead.append(len(produced) - len(consumed))
+            yield [1.0]
+
+    def slow_sink(result):
+        time.sleep(0.005)
+        consumed.append(result)
+
+    pipeline = StreamingPipeline(network_linear, sink=slow_sink, max_pending_samples=1)
+    pipeline.run(source())
+    assert len(consumed) == 20
+    # one sample in each queue, one in each stage
+    assert max(lead) <= 5
+
+
+def test_sink_error_is_raised(network_linear):
+    def bad_sink(result):
+        raise RuntimeError("sink failed")
+
+    pipeline = StreamingPipeline(network_linear, sink=bad_sink, max_pending_samples=1)
+    with pytest.raises(RuntimeError):
+        pipeline.run([[1.0]] * 10)
+
+
+def test_drain_pending_spikes(network_linear):
+    pipeline = StreamingPipeline(
+        network_linear, sink=lambda result: None, input_offset=80, max_pending_spikes=1
+    )
+    network_linear.send_input_data([(0, 1.0)], 1150)
+    network_linear.send_input_data([(0, 1.0)], 1160)
+    assert network_linear.pending_spikes() == 2
+    pipeline.step([0.0])
+    assert pipeline.drain_cycles == 2
+    assert len(network_linear.neurons[0].spike_queue) == 0
+
+
+def test_run_async(network_linear):
+    results = []
+
+    async def source():
+        for value in [1.0, 0.0, 2.0]:
+            yield [value]
+
+    async def sink(result):
+        await asyncio.sleep(0)
+        results.append(result)
+
+    pipeline = StreamingPipeline(network_linear, sink=sink, max_pending_samples=1)
+    latencies = asyncio.run(pipeline.run_async(source()))
+    assert len(results) == 3
+    assert len(latencies) == 3
+
+
+def test_run_max_samples_keeps_next_observation(network_linear):
+    source = iter(range(10))
+    pipeline = StreamingPipeline(network_linear, sink=lambda result: None)
+    pipeline.run(([value] for value in source), max_samples=3)
+    assert next(source) == 3
+    source = iter(range(10))
+    asyncio.run(pipeline.run_async(([value] for value in source), max_samples=3))
+    assert next(source) == 3
+
+
+def test_sink_error_with_blocked_source(network_linear):
+    release = threading.Event()
+
+    def source():
+        yield [1.0]
+        # a live source waiting for its next observation
+        release.wait()
+        yield [1.0]
+
+    def bad_sink(result):
+        raise RuntimeError("sink failed")
+
+    pipeline = StreamingPipeline(network_linear, sink=bad_sink)
+    errors = []
+
+    def run():
+        try:
+            pipeline.run(source())
+        except RuntimeError as e:
+            errors.append(e)
+
+    runner = threading.Thread(target=run, daemon=True)
+    runner.start()
+    runner.join(timeout=5)
+    release.set()
+    assert not runner.is_alive()
+    assert len(errors) == 1
@@ -0,0 +1,112 @@
+from neuron_net.src.models.Network import Network
+from neuron_net.src.interfaces.ToyEnv import CueMatchEnv
+from neuron_net.src.interfaces.VectorEnv import SyncVectorEnv, NetworkPolicy, rollout
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def network_two_way():
+    """
+    0 -> 2-(out)
+    1 -> 3-(out)
+    """
+    return Network(
+        {0: [2], 1: [3], 2: [], 3: []},
+        [0, 1],
+        [2, 3],
+        period_start_time=1000,
+        clock_cycle_period=100,
+        name="policy_network",
+    )
+
+
+def test_toy_env():
+    env = CueMatchEnv(n_cues=3, max_episode_steps=2, seed=0)
+    observation, info = env.reset()
+    assert observation.shape == (3,)
+    cue = int(np.argmax(observation))
+    observation, reward, terminated, truncated, info = env.step(cue)
+    assert reward == 1.0
+    assert not terminated and not truncated
+    _, _, _, truncated, _ = env.step(0)
+    assert truncated
+    with pytest.raises(ValueError):
+        env.step(3)
+
+
+def test_sync_vector_env_autoreset():
+    env = SyncVectorEnv([lambda: CueMatchEnv(max_episode_steps=1) for _ in range(3)])
+    observations, _ = env.reset(seed=0)
+    assert observations.shape == (3, 2)
+    observations, rewards, terminations, truncations, infos = env.step([0, 1, 0])
+    assert observations.shape == (3, 2)
+    assert rewards.shape == (3,)
+    assert truncations.all()
+    assert len(infos["final_observation"]) == 3
+    with pytest.raises(ValueError):
+        env.step([0])
+
+
+def test_network_policy_batch(network_two_way):
+    policy = NetworkPolicy(network_two_way, num_envs=3, input_offset=80)
+    assert len(policy.replicas) == 3
+    assert policy.replicas[0] is network_two_way
+    actions = policy(np.array([[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]]))
+    assert actions.shape == (3,)
+    # each replica only received the spikes of its own observation
+    assert len(policy.replicas[0].neurons[0].curr_spikes) == 1
+    assert len(policy.replicas[0].neurons[1].curr_spikes) == 0
+    assert len(policy.replicas[1].neurons[1].curr_spikes) == 1
+    assert len(policy.replicas[2].neurons[0].curr_spikes) == 0
+    with pytest.raises(ValueError):
+        policy(np.zeros((2, 2)))
+
+
+def test_network_policy_shared_weights(network_two_way):
+    policy = NetworkPolicy(network_two_way, num_envs=2)
+    assert policy.replicas[1].neurons[0].synapses is network_two_way.neurons[0].synapses
+    policy = NetworkPolicy(network_two_way, num_envs=2, share_weights=False)
+    assert (
+        policy.replicas[1].neurons[0].synapses
+        is not network_two_way.neurons[0].synapses
+    )
+
+
+def test_rollout(network_two_way):
+    env = SyncVectorEnv([lambda: CueMatchEnv(max_episode_steps=5) for _ in range(4)])
+    policy = NetworkPolicy(network_two_way, num_envs=4, input_offset=80)
+    stats = rollout(policy, env, num_steps=10, seed=0)
+    assert stats["steps"] == 40
+    assert stats["steps_per_sec"] > 0
+    assert stats["episodes"] == 8
+    assert 0 <= stats["total_reward"] <= 40
+
+
+def test_network_policy_shared_weights_pruning(network_two_way):
+    policy = NetworkPolicy(network_two_way, num_envs=2)
+    # both replicas depress the shared synapse 0 -> 2 until it is pruned
+    for replica in policy.replicas:
+        replica.neurons[0].receive_weight_update(2, delta_t=-1)
+        replica.neurons[0].receive_weight_update(2, delta_t=-1)
+    for replica in policy.replicas:
+        replica.neurons[0].process_weight_updates()
+    assert 2 not in network_two_way.neurons[0].synapses
+    assert 2 not in policy.replicas[1].neurons[0].synapses
+
+
+def test_network_policy_reads_input_list(network_two_way):
+    policy = NetworkPolicy(network_two_way, num_envs=1, input_offset=80)
+    network_two_way.input_list = [1, 0]
+    policy(np.array([[1.0, 0.0]]))
+    assert len(network_two_way.neurons[1].curr_spikes) == 1
+    assert len(network_two_way.neurons[0].curr_spikes) == 0
+
+
+def test_network_policy_does_not_copy_monitors(network_two_way):
+    monitor = []
+    network_two_way.monitors.append(monitor.append)
+    policy = NetworkPolicy(network_two_way, num_envs=3, input_offset=80)
+    assert [replica.monitors for replica in policy.replicas[1:]] == [[], []]
+    policy(np.zeros((3, 2)))
+    assert monitor == [network_two_way]
@@ -0,0 +1,151 @@
+from neuron_net.src.visualization.ActivitySnapshot import ActivityWriter, ActivityReader
+from neuron_net.src.visualization.ActivityServer import ActivityServer, downsample
+from urllib.request import urlopen
+import numpy as np
+import json
+import pytest
+
+
+@pytest.fixture
+def writer():
+    writer = ActivityWriter(capacity=8, max_synapses=8, weight_interval=1)
+    yield writer
+    writer.close()
+
+
+def test_downsample():
+    values = np.arange(10, dtype=np.float32)
+    assert downsample(values, 20) is values
+    assert downsample(values, 5).tolist() == [1, 3, 5, 7, 9]
+    assert downsample(values, 4, np.add).tolist() == [3, 12, 21, 9]
+    assert len(downsample(np.zeros(100_000), 1000)) == 1000
+
+
+def test_snapshot_roundtrip(network_linear, writer):
+    reader = ActivityReader(writer.name)
+    assert reader.read(retries=1) is None
+    network_linear.monitors.append(writer)
+    network_linear.send_input_data([(0, 1.0)], 1080)
+    network_linear.update(1100)
+    snapshot = reader.read()
+    assert snapshot["cycle"] == 0
+    assert snapshot["time"] == 1100
+    assert snapshot["ids"].tolist() == [0, 1, 2, 3]
+    assert snapshot["spike_counts"].tolist() == [1, 1, 0, 0]
+    assert snapshot["last_activation"][0] == 1080
+    assert snapshot["weights"].tolist() == pytest.approx([0.2] * 3)
+    assert snapshot["pre_ids"].tolist() == [0, 1, 2]
+    reader.close()
+
+
+def test_snapshot_capacity(network_linear):
+    writer = ActivityWriter(capacity=2)
+    reader = ActivityReader(writer.name)
+    writer.publish(network_linear)
+    snapshot = reader.read()
+    assert snapshot["ids"].tolist() == [0, 1]
+    assert len(snapshot["weights"]) == 0
+    reader.close()
+    writer.close()
+
+
+def test_activity_server(network_linear, writer):
+    server = ActivityServer(writer.name, max_neurons=2, trace_neurons=[0, 3])
+    assert server.data() == {"cycle": None}
+    network_linear.monitors.append(writer)
+    network_linear.send_input_data([(0, 1.0)], 1080)
+    network_linear.update(1100)
+    assert server.poll()
+    # the same cycle is only recorded once
+    assert not server.poll()
+    server.start()
+    try:
+        host, port = server.address
+        data = json.loads(urlopen(f"http://{host}:{port}/data").read())
+        page = urlopen(f"http://{host}:{port}/").read().decode()
+    finally:
+        server.stop()
+    assert data["n_neurons"] == 4
+    assert data["bin_size"] == 2
+    assert len(data["potentials"]) == 2
+    assert data["raster"] == [[0, [0]]]
+    assert set(data["traces"]) == {"0", "3"}
+    assert data["weights"]["count"] == 3
+    assert "<canvas" in page
+
+
+def test_snapshot_incremental_weights(network_linear, writer):
+    reader = ActivityReader(writer.name)
+    writer.publish(network_linear)
+    network_linear.neurons[1].synapses[2] = 0.5
+    del network_linear.neurons[2].synapses[3]
+    writer.publish(network_linear)
+    snapshot = reader.read()
+    assert snapshot["pre_ids"].tolist() == [0, 1]
+    assert snapshot["weights"].tolist() == pytest.approx([0.2, 0.5])
+    # a neuron gaining synapses lays out the segments again
+    network_linear.neurons[3].add_synapse(0, weight=0.3)
+    writer.publish(network_linear)
+    snapshot = reader.read()
+    assert snapshot["pre_ids"].tolist() == [0, 1, 3]
+    assert snapshot["post_ids"].tolist() == [1, 2, 0]
+    reader.close()
+
+
+def test_activity_server_stop_without_start(writer):
+    server = ActivityServer(writer.name)
+    server.stop()
+
+
+def test_snapshot_spike_history(network_linear):
+    writer = ActivityWriter(capacity=8, history=3)
+    reader = ActivityReader(writer.name)
+    network_linear.monitors.append(writer)
+    for cycle in range(4):
+        network_linear.send_input_data([(0, 1.0)], 1030 + 100 * cycle)
+        network_linear.update(1100 + 100 * cycle)
+    snapshot = reader.read(since_cycle=0)
+    # cycle 0 left the ring, it only keeps the last 3 cycles
+    assert [cycle for cycle, _ in snapshot["spike_history"]] == [1, 2, 3]
+    assert (
+        snapshot["spike_history"][-1][1].tolist() == snapshot["spike_counts"].tolist()
+    )
+    assert [c for c, _ in reader.read(since_cycle=2)["spike_history"]] == [3]
+    assert "spike_history" not in reader.read()
+    reader.close()
+    writer.close()
+
+
+def test_activity_server_missed_cycles(network_linear):
+    writer = ActivityWriter(capacity=8, history=2)
+    server = ActivityServer(writer.name, history=10)
+    network_linear.monitors.append(writer)
+    for cycle in range(4):
+        network_linear.send_input_data([(0, 1.0)], 1030 + 100 * cycle)
+        network_linear.update(1100 + 100 * cycle)
+        if cycle in (0, 3):
+            assert server.poll()
+    # cycle 1 left the ring before the second poll, cycle 2 is filled from it
+    assert [cycle for cycle, _ in server.data()["raster"]] == [0, 2, 3]
+    assert server.data()["history"] == 10
+    server.stop()
+    writer.close()
+
+
+def test_snapshot_bulk_weights(network_linear, writer):
+    reader = ActivityReader(writer.name)
+    writer.publish(network_linear)
+    # most neurons changed, all segments are rewritten at once
+    for neuron_id in (0, 1, 2):
+        network_linear.neurons[neuron_id].synapses[neuron_id + 1] = 0.1 * neuron_id
+    writer.publish(network_linear)
+    snapshot = reader.read()
+    assert snapshot["weights"].tolist() == pytest.approx([0.0, 0.1, 0.2])
+    # max_synapses cuts the segments at the end
+    small = ActivityWriter(capacity=8, max_synapses=2)
+    small_reader = ActivityReader(small.name)
+    small.publish(network_linear)
+    assert small_reader.read()["pre_ids"].tolist() == [0, 1]
+    small_reader.close()
+    small.close()
+    reader.close()
@@ -0,0 +1,69 @@
+from neuron_net.src.models.Network import Network
+from neuron_net.src.models.Synapses import Synapses
+from neuron_net.src.models.WeightSnapshot import diff_snapshots
+import pytest
+
+
+@pytest.fixture
+def network_tree():
+    """
+      -1
+     / |
+    0  3-(out)
+    | /^
+    2
+    """
+    return Network(
+        {0: [1, 2], 1: [3], 2: [3], 3: []},
+        [0],
+        [3],
+        period_start_time=1000,
+    )
+
+
+def test_synapses_version():
+    synapses = Synapses({1: 0.2})
+    assert synapses == {1: 0.2}
+    synapses[2] = 0.3
+    del synapses[1]
+    synapses.update({4: 0.1})
+    assert synapses.version == 3
+
+
+def test_get_weight_matrix(network_tree):
+    weights, ids = network_tree.get_weight_matrix()
+    assert ids.tolist() == [0, 1, 2, 3]
+    assert weights.shape == (4, 4)
+    assert weights.nnz == 4
+    assert weights[0, 1] == 0.2
+    assert weights[2, 3] == 0.2
+    assert weights[3, 0] == 0
+
+
+def test_snapshot_copy_on_write(network_tree):
+    first = network_tree.snapshot_weights()
+    network_tree.neurons[1].synapses[3] = 0.5
+    second = network_tree.snapshot_weights()
+    # unchanged neurons share their frozen synapses
+    assert second.blocks[0] is first.blocks[0]
+    assert second.blocks[1] is not first.blocks[1]
+    assert first.blocks[1][1].tolist() == [0.2]
+    assert second.blocks[1][1].tolist() == [0.5]
+    with pytest.raises(ValueError):
+        first.blocks[0][1][0] = 1.0
+
+
+def test_diff_snapshots(network_tree):
+    before = network_tree.snapshot_weights()
+    neurons = network_tree.neurons
+    neurons[0].synapses[1] = 0.4
+    del neurons[1].synapses[3]
+    neurons[3].add_synapse(0, weight=0.1)
+    neurons[2].synapses[3] = 0.2 + 1e-9
+    after = network_tree.snapshot_weights()
+    diff = diff_snapshots(before, after, atol=1e-6)
+    assert len(diff) == 3
+    assert diff.changed.tolist() == [(0, 1, 0.2, 0.4)]
+    assert diff.pruned.tolist() == [(1, 3, 0.2)]
+    assert diff.new.tolist() == [(3, 0, 0.1)]
+    assert len(diff_snapshots(after, after)) == 0
@@ -0,0 +1,292 @@
+from typing import Dict, List, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from collections import deque
+from neuron_net.src.visualization.ActivitySnapshot import ActivityReader
+import numpy as np
+import json
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.propagate = True
+
+
+def downsample(values: np.ndarray, max_points: int, reduce=np.maximum) -> np.ndarray:
+    """Reduce an array to at most max_points by combining neighbouring entries
+    Args:
+        values: 1D array
+        max_points: maximum length of the result
+        reduce: ufunc combining the entries of a bin (np.maximum, np.add, ...)
+    """
+    bin_size = _bin_size(len(values), max_points)
+    if bin_size == 1:
+        return values
+    return reduce.reduceat(values, np.arange(0, len(values), bin_size))
+
+
+def _bin_size(length: int, max_points: int) -> int:
+    """Number of entries combined per bin by downsample"""
+    return max(1, -(-length // max_points))
+
+
+class ActivityServer:
+    """Serves a live view of a network's activity on a local web page.
+    A background thread polls the shared memory snapshot published by an
+    ActivityWriter and keeps a short history of downsampled frames, so the
+    simulation never waits for the server or its clients. The raster is filled from
+    the writer's spike history ring, cycles that left the ring between two polls
+    are shown as gaps.
+    """
+
+    def __init__(
+        self,
+        snapshot_name: str,
+        host="127.0.0.1",
+        port=0,
+        max_neurons=1000,
+        history=200,
+        trace_neurons: Optional[List[int]] = None,
+        poll_interval=0.05,
+    ):
+        """Initialize the server
+        Args:
+            snapshot_name: ActivityWriter.name
+            host: address to listen on
+            port: port to listen on, 0 picks a free port
+            max_neurons: number of neuron bins shown, larger networks are downsampled
+            history: number of cycles kept for the raster plot and traces
+            trace_neurons: ids of the neurons with membrane traces
+            poll_interval: seconds between reads of the snapshot
+        """
+        self.reader = ActivityReader(snapshot_name)
+        self.max_neurons = max_neurons
+        self.trace_neurons = list(trace_neurons or [])
+        self.poll_interval = poll_interval
+        self._frames = deque(maxlen=history)
+        self._traces = {
+            neuron_id: deque(maxlen=history) for neuron_id in self.trace_neurons
+        }
+        self._latest = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._serving = False
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.address = self._httpd.server_address
+
+    def poll(self) -> bool:
+        """Read the snapshot once and record a frame for every cycle published since
+        the last poll that is still in the writer's spike history ring
+        """
+        with self._lock:
+            last_cycle = -1 if self._latest is None else self._latest["cycle"]
+        snapshot = self.reader.read(since_cycle=last_cycle)
+        if snapshot is None or snapshot["cycle"] == last_cycle:
+            return False
+        potentials = downsample(snapshot["potentials"], self.max_neurons)
+        positions = {int(n): idx for idx, n in enumerate(snapshot["ids"].tolist())}
+        history = snapshot["spike_history"]
+        if not history or history[-1][0] != snapshot["cycle"]:
+            # the writer keeps no history
+            history.append((snapshot["cycle"], snapshot["spike_counts"]))
+        frames = [
+            {
+                "cycle": cycle,
+                "spiking_bins": np.flatnonzero(
+                    downsample(spike_counts, self.max_neurons, np.add)
+                ).tolist(),
+            }
+            for cycle, spike_counts in history
+        ]
+        with self._lock:
+            self._latest = {
+                "cycle": snapshot["cycle"],
+                "time": snapshot["time"],
+                "n_neurons": len(snapshot["ids"]),
+                "bin_size": _bin_size(len(snapshot["ids"]), self.max_neurons),
+                "history": self._frames.maxlen,
+                "potentials": potentials.tolist(),
+                "weights": _weight_summary(snapshot["weights"]),
+            }
+            self._frames.extend(frames)
+            for neuron_id, trace in self._traces.items():
+                idx = positions.get(neuron_id)
+                trace.append(
+                    None if idx is None else float(snapshot["potentials"][idx])
+                )
+        return True
+
+    def data(self) -> Dict:
+        """Everything the web page draws, as a JSON serializable dictionary"""
+        with self._lock:
+            if self._latest is None:
+                return {"cycle": None}
+            return {
+                **self._latest,
+                "raster": [
+                    [frame["cycle"], frame["spiking_bins"]] for frame in self._frames
+                ],
+                "traces": {str(n): list(trace) for n, trace in self._traces.items()},
+            }
+
+    def start(self):
+        """Start polling and serving in background threads"""
+        self._threads = [
+            threading.Thread(target=self._poll_loop, daemon=True),
+            threading.Thread(target=self._httpd.serve_forever, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._serving = True
+        logger.info(f"Activity server at http://{self.address[0]}:{self.address[1]}/")
+
+    def stop(self):
+        """Stop the threads and detach from the snapshot"""
+        self._stop.set()
+        if self._serving:
+            # shutdown waits for serve_forever, which only runs after start
+            self._httpd.shutdown()
+            self._serving = False
+        self._httpd.server_close()
+        for thread in self._threads:
+            thread.join()
+        self.reader.close()
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.poll_interval)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == "/":
+                    body, content_type = _PAGE.encode(), "text/html"
+                elif path == "/data":
+                    body, content_type = (
+                        json.dumps(server.data()).encode(),
+                        "application/json",
+                    )
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+def _weight_summary(weights: np.ndarray, bins=20) -> Dict:
+    """Histogram of the published weights"""
+    if len(weights) == 0:
+        return {"count": 0, "counts": [], "edges": []}
+    counts, edges = np.histogram(weights, bins=bins)
+    return {"count": len(weights), "counts": counts.tolist(), "edges": edges.tolist()}
+
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<title>Neuron activity</title>
+<style>
+body { font-family: sans-serif; margin: 1em; }
+canvas { border: 1px solid #ccc; display: block; margin-bottom: 1em; }
+</style>
+</head>
+<body>
+<div id="status">waiting for the simulation...</div>
+<h3>Spike raster</h3>
+<canvas id="raster" width="900" height="300"></canvas>
+<h3>Membrane potentials</h3>
+<canvas id="potentials" width="900" height="150"></canvas>
+<h3>Membrane traces</h3>
+<canvas id="traces" width="900" height="200"></canvas>
+<script>
+const colors = ["#d62728", "#1f77b4", "#2ca02c", "#ff7f0e", "#9467bd", "#8c564b"];
+
+function clear(canvas) {
+  const ctx = canvas.getContext("2d");
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+  return ctx;
+}
+
+function drawRaster(data) {
+  const canvas = document.getElementById("raster");
+  const ctx = clear(canvas);
+  const bins = data.potentials.length;
+  // frames are placed by cycle, so cycles missed between polls leave gaps
+  const first = data.cycle - data.history + 1;
+  const w = canvas.width / data.history;
+  const h = canvas.height / Math.max(bins, 1);
+  ctx.fillStyle = "#000";
+  data.raster.forEach(([cycle, spiking]) => {
+    const x = (cycle - first) * w;
+    spiking.forEach((bin) => ctx.fillRect(x, bin * h, Math.max(w, 1), Math.max(h, 1)));
+  });
+}
+
+function drawPotentials(data) {
+  const canvas = document.getElementById("potentials");
+  const ctx = clear(canvas);
+  const values = data.potentials;
+  const max = Math.max(...values.map(Math.abs), 1e-9);
+  const w = canvas.width / Math.max(values.length, 1);
+  ctx.fillStyle = "#1f77b4";
+  values.forEach((v, i) => {
+    const h = (Math.abs(v) / max) * canvas.height;
+    ctx.fillRect(i * w, canvas.height - h, Math.max(w, 1), h);
+  });
+}
+
+function drawTraces(data) {
+  const canvas = document.getElementById("traces");
+  const ctx = clear(canvas);
+  const traces = Object.entries(data.traces);
+  const all = traces.flatMap(([id, trace]) => trace.filter((v) => v !== null));
+  const max = Math.max(...all.map(Math.abs), 1e-9);
+  traces.forEach(([id, trace], i) => {
+    ctx.strokeStyle = colors[i % colors.length];
+    ctx.beginPath();
+    const w = canvas.width / Math.max(trace.length - 1, 1);
+    trace.forEach((v, x) => {
+      if (v === null) return;
+      const y = canvas.height / 2 - (v / max) * (canvas.height / 2);
+      x === 0 ? ctx.moveTo(x * w, y) : ctx.lineTo(x * w, y);
+    });
+    ctx.stroke();
+    ctx.fillStyle = ctx.strokeStyle;
+    ctx.fillText("neuron " + id, 5, 12 + 12 * i);
+  });
+}
+
+async function refresh() {
+  try {
+    const data = await (await fetch("/data")).json();
+    if (data.cycle !== null) {
+      document.getElementById("status").textContent =
+        `cycle ${data.cycle}, time ${data.time}, ${data.n_neurons} neurons ` +
+        `(${data.bin_size} per bin), ${data.weights.count} synapses`;
+      drawRaster(data);
+      drawPotentials(data);
+      drawTraces(data);
+    }
+  } finally {
+    setTimeout(refresh, 500);
+  }
+}
+refresh();
+</script>
+</body>
+</html>
+"""
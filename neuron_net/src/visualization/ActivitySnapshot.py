@@ -0,0 +1,326 @@
+from typing import Dict, Optional
+from itertools import chain
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.propagate = True
+
+# header slots (int64)
+_SEQUENCE = 0  # odd while the writer is publishing
+_CAPACITY = 1
+_NUM_NEURONS = 2
+_CYCLE = 3
+_MAX_SYNAPSES = 4
+_NUM_SYNAPSES = 5
+_WRITER_PID = 6
+_HISTORY = 7
+_HEADER_SIZE = 8
+
+
+def _layout(capacity: int, max_synapses: int, history: int):
+    """Offsets and dtypes of the arrays in the shared memory block"""
+    fields = [
+        ("header", np.int64, _HEADER_SIZE),
+        ("time", np.float64, 1),
+        ("ids", np.int64, capacity),
+        ("potentials", np.float32, capacity),
+        ("spike_counts", np.uint32, capacity),
+        ("last_activation", np.float64, capacity),
+        ("pre_ids", np.int64, max_synapses),
+        ("post_ids", np.int64, max_synapses),
+        ("weights", np.float32, max_synapses),
+        # ring of the spike counts of the last history cycles
+        ("history_cycles", np.int64, history),
+        ("history_spikes", np.uint8, history * capacity),
+    ]
+    layout = {}
+    offset = 0
+    for name, dtype, count in fields:
+        # keep every array aligned to 8 bytes
+        offset = -(-offset // 8) * 8
+        layout[name] = (offset, dtype, count)
+        offset += np.dtype(dtype).itemsize * count
+    return layout, offset
+
+
+def _views(buffer, layout) -> Dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(count, dtype=dtype, buffer=buffer, offset=offset)
+        for name, (offset, dtype, count) in layout.items()
+    }
+
+
+class ActivityWriter:
+    """Publishes the activity of a network into a shared memory block once per cycle.
+    Register it with network.monitors.append(writer). Publishing never waits for
+    readers: a sequence counter in the header is odd while a snapshot is being
+    written, readers retry if it changed while they were copying.
+    The spike counts of the last history cycles are kept in a ring, so readers
+    polling less often than once per cycle still see every spike.
+    Weights are published incrementally: every neuron owns a segment of the weight
+    arrays and only the segments of neurons whose synapses changed are rewritten.
+    Slots freed by pruning are marked with a post id of -1.
+    Publishing runs inside Network.update. Every cycle costs one pass over the
+    published neurons. Every weight_interval cycles the weights add one version
+    check per neuron plus the changed synapses, or one bulk pass over all synapses
+    when many neurons changed or the segments are laid out again (neurons added or
+    removed, a neuron gained synapses). Raise weight_interval for large networks.
+    """
+
+    def __init__(
+        self, capacity: int, max_synapses=0, weight_interval=10, history=64, name=None
+    ):
+        """Create the shared memory block
+        Args:
+            capacity: maximum number of neurons, further neurons are not published
+            max_synapses: maximum number of published synapses, 0 to not publish weights
+            weight_interval: publish the weights every this many cycles
+            history: number of cycles kept in the spike count ring
+            name: name of the shared memory block, generated if None
+        """
+        self.layout, size = _layout(capacity, max_synapses, history)
+        self._shm = SharedMemory(name=name, create=True, size=size)
+        self.name = self._shm.name
+        self._arrays = _views(self._shm.buf, self.layout)
+        header = self._arrays["header"]
+        header[_CAPACITY] = capacity
+        header[_MAX_SYNAPSES] = max_synapses
+        header[_WRITER_PID] = os.getpid()
+        header[_HISTORY] = history
+        self._arrays["history_cycles"][:] = -1
+        self.capacity = capacity
+        self.history = history
+        self.max_synapses = max_synapses
+        self.weight_interval = weight_interval
+        self._cycle = 0
+        # weight segments, one entry per neuron in every list
+        self._index = {}  # neuron_id: segment index
+        self._starts = []
+        self._sizes = []
+        self._synapses = []
+        self._versions = []
+        # some segments are smaller than their synapses because max_synapses is reached
+        self._truncated = False
+
+    def __call__(self, network):
+        self.publish(network)
+
+    def publish(self, network):
+        """Write the potentials, spikes and (every weight_interval cycles) weights of a network"""
+        arrays = self._arrays
+        header = arrays["header"]
+        neurons = list(network.neurons.values())[: self.capacity]
+        n = len(neurons)
+        ids = np.fromiter((neuron.id for neuron in neurons), dtype=np.int64, count=n)
+        potentials = np.fromiter(
+            (neuron._V for neuron in neurons), dtype=np.float32, count=n
+        )
+        spike_counts = np.fromiter(
+            (neuron._num_spikes for neuron in neurons), dtype=np.uint32, count=n
+        )
+        last_activation = np.fromiter(
+            (neuron._time_of_last_activation for neuron in neurons),
+            dtype=np.float64,
+            count=n,
+        )
+        # neurons store times relative to the network's time origin, as in
+        # Network.get_time_of_last_activation
+        last_activation += network.time_origin
+        publish_weights = self.max_synapses and self._cycle % self.weight_interval == 0
+
+        header[_SEQUENCE] += 1
+        arrays["ids"][:n] = ids
+        arrays["potentials"][:n] = potentials
+        arrays["spike_counts"][:n] = spike_counts
+        arrays["last_activation"][:n] = last_activation
+        arrays["time"][0] = network.period_start_time
+        header[_NUM_NEURONS] = n
+        header[_CYCLE] = self._cycle
+        if self.history:
+            row = (self._cycle % self.history) * self.capacity
+            history_spikes = arrays["history_spikes"]
+            history_spikes[row : row + n] = np.minimum(spike_counts, 255)
+            history_spikes[row + n : row + self.capacity] = 0
+            arrays["history_cycles"][self._cycle % self.history] = self._cycle
+        if publish_weights:
+            self._publish_weights(network)
+        header[_SEQUENCE] += 1
+        self._cycle += 1
+
+    def _publish_weights(self, network):
+        """Rewrite the weight segments of the neurons whose synapses changed.
+        The segments are laid out again only when neurons were added or removed or a
+        neuron gained synapses, otherwise the cost is one version check per neuron
+        plus the changed synapses.
+        """
+        index = self._index
+        neurons = network.neurons
+        changed = []
+        relayout = index.keys() != neurons.keys()
+        if not relayout:
+            sizes, synapses, versions = self._sizes, self._synapses, self._versions
+            for neuron_id, neuron in neurons.items():
+                i = index[neuron_id]
+                if synapses[i] is neuron.synapses and versions[i] is not None:
+                    if getattr(synapses[i], "version", None) == versions[i]:
+                        continue
+                if len(neuron.synapses) > sizes[i] and not self._truncated:
+                    relayout = True
+                    break
+                changed.append(neuron_id)
+        if relayout or len(changed) > len(neurons) // 4:
+            # one bulk pass is cheaper than many small segment writes
+            self._write_all(neurons)
+            return
+        for neuron_id in changed:
+            self._write_segment(index[neuron_id], neuron_id, neurons[neuron_id])
+
+    def _write_all(self, neurons):
+        """Lay out the segments again and write all synapses in one pass"""
+        count = len(neurons)
+        sizes = np.fromiter(
+            (len(neuron.synapses) for neuron in neurons.values()),
+            dtype=np.int64,
+            count=count,
+        )
+        starts = np.zeros(count, dtype=np.int64)
+        np.cumsum(sizes[:-1], out=starts[1:])
+        # segments past max_synapses are cut, they are always at the end
+        clipped = np.minimum(sizes, np.maximum(self.max_synapses - starts, 0))
+        total = int(clipped.sum())
+        self._truncated = total < int(sizes.sum())
+        ids = np.fromiter(neurons.keys(), dtype=np.int64, count=count)
+        arrays = self._arrays
+        arrays["pre_ids"][:total] = np.repeat(ids, clipped)
+        arrays["post_ids"][:total] = np.fromiter(
+            chain.from_iterable(neuron.synapses.keys() for neuron in neurons.values()),
+            dtype=np.int64,
+            count=total,
+        )
+        arrays["weights"][:total] = np.fromiter(
+            chain.from_iterable(
+                neuron.synapses.values() for neuron in neurons.values()
+            ),
+            dtype=np.float32,
+            count=total,
+        )
+        arrays["header"][_NUM_SYNAPSES] = total
+        self._index = dict(zip(neurons.keys(), range(count)))
+        self._starts = starts.tolist()
+        self._sizes = clipped.tolist()
+        self._synapses = [neuron.synapses for neuron in neurons.values()]
+        self._versions = [
+            getattr(synapses, "version", None) for synapses in self._synapses
+        ]
+
+    def _write_segment(self, i, neuron_id, neuron):
+        start, size = self._starts[i], self._sizes[i]
+        synapses = neuron.synapses
+        self._synapses[i] = synapses
+        self._versions[i] = getattr(synapses, "version", None)
+        count = min(len(synapses), size)
+        post_ids = np.fromiter(synapses.keys(), dtype=np.int64, count=len(synapses))
+        weights = np.fromiter(synapses.values(), dtype=np.float32, count=len(synapses))
+        arrays = self._arrays
+        arrays["pre_ids"][start : start + size] = neuron_id
+        arrays["post_ids"][start : start + count] = post_ids[:count]
+        arrays["post_ids"][start + count : start + size] = -1
+        arrays["weights"][start : start + count] = weights[:count]
+        arrays["weights"][start + count : start + size] = 0
+
+    def close(self):
+        """Release and remove the shared memory block"""
+        self._arrays = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+class ActivityReader:
+    """Reads the snapshots published by an ActivityWriter, possibly from another process"""
+
+    def __init__(self, name: str):
+        """Attach to the shared memory block of a writer
+        Args:
+            name: ActivityWriter.name
+        """
+        try:
+            self._shm = SharedMemory(name=name, track=False)
+        except TypeError:
+            self._shm = SharedMemory(name=name)
+            header = np.ndarray(_HEADER_SIZE, dtype=np.int64, buffer=self._shm.buf)
+            if header[_WRITER_PID] != os.getpid():
+                # before Python 3.13 attaching registers the block with the resource
+                # tracker, which would remove it when this process exits. In the
+                # writer's process the registration is the writer's own.
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+        header = np.ndarray(_HEADER_SIZE, dtype=np.int64, buffer=self._shm.buf)
+        self.capacity = int(header[_CAPACITY])
+        self.layout, _ = _layout(
+            self.capacity, int(header[_MAX_SYNAPSES]), int(header[_HISTORY])
+        )
+        self._arrays = _views(self._shm.buf, self.layout)
+
+    def read(self, retries=100, since_cycle=None) -> Optional[Dict]:
+        """Copy the latest complete snapshot
+        Args:
+            retries: number of attempts while the writer is publishing
+            since_cycle: also copy the spike counts of the cycles after this one
+                that are still in the writer's history ring
+        Returns:
+            dictionary with the cycle, time, neuron ids, potentials, spike counts,
+            last activation times, weights (pre_ids, post_ids, weights) and with
+            since_cycle the spike history [(cycle, spike_counts)] in cycle order,
+            None if no complete snapshot could be copied
+        """
+        arrays = self._arrays
+        header = arrays["header"]
+        for _ in range(retries):
+            sequence = int(header[_SEQUENCE])
+            if sequence % 2 or sequence == 0:
+                continue
+            n = int(header[_NUM_NEURONS])
+            num_synapses = int(header[_NUM_SYNAPSES])
+            post_ids = arrays["post_ids"][:num_synapses].copy()
+            pre_ids = arrays["pre_ids"][:num_synapses].copy()
+            weights = arrays["weights"][:num_synapses].copy()
+            history = []
+            if since_cycle is not None:
+                cycles = arrays["history_cycles"]
+                for row in np.flatnonzero(cycles > since_cycle).tolist():
+                    start = row * self.capacity
+                    history.append(
+                        (
+                            int(cycles[row]),
+                            arrays["history_spikes"][start : start + n].copy(),
+                        )
+                    )
+            snapshot = {
+                "cycle": int(header[_CYCLE]),
+                "time": float(arrays["time"][0]),
+                "ids": arrays["ids"][:n].copy(),
+                "potentials": arrays["potentials"][:n].copy(),
+                "spike_counts": arrays["spike_counts"][:n].copy(),
+                "last_activation": arrays["last_activation"][:n].copy(),
+            }
+            if int(header[_SEQUENCE]) == sequence:
+                # skip the slots freed by pruning
+                valid = post_ids >= 0
+                snapshot["pre_ids"] = pre_ids[valid]
+                snapshot["post_ids"] = post_ids[valid]
+                snapshot["weights"] = weights[valid]
+                if since_cycle is not None:
+                    snapshot["spike_history"] = sorted(
+                        history, key=lambda entry: entry[0]
+                    )
+                return snapshot
+        return None
+
+    def close(self):
+        """Detach from the shared memory block"""
+        self._arrays = None
+        self._shm.close()